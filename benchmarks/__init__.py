@@ -0,0 +1 @@
+"""Benchmarks for the Lemonfox Transkriptor GUI pipeline."""
@@ -0,0 +1,91 @@
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from lemonfox_gui.buffer import CaptureBuffer, CHUNK_SECONDS
+
+from .common import peak_rss_mb, percentile
+
+BLOCK_FRAMES = 512
+
+
+def run_case(mode, minutes, sample_rate, channels):
+    block = np.random.default_rng(0).standard_normal((BLOCK_FRAMES, channels)).astype("float32")
+    total_blocks = minutes * 60 * sample_rate // BLOCK_FRAMES
+    timings = []
+    clock = time.perf_counter
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if mode == "list":
+            frames = []
+
+            def callback(indata):
+                frames.append(indata.copy())
+
+        else:
+            buffer = CaptureBuffer(
+                channels,
+                sample_rate * CHUNK_SECONDS,
+                spill_dir=tmp if mode == "mmap" else None,
+            )
+            callback = buffer.write
+
+        for _ in range(total_blocks):
+            started = clock()
+            callback(block)
+            timings.append(clock() - started)
+
+        # Stopping the list recorder means joining its blocks; the capture buffer only
+        # reports its frame count and is read lazily afterwards.
+        started = clock()
+        if mode == "list":
+            data = np.concatenate(frames, axis=0)
+            frames_captured = len(data)
+            del data
+        else:
+            frames_captured = buffer.frames
+        stop_seconds = clock() - started
+        if mode != "list":
+            buffer.close()
+
+    micros = [t * 1e6 for t in timings]
+    print(
+        f"{mode:>6} {minutes:>3} min  frames={frames_captured:>10}  "
+        f"callback p50={percentile(micros, 50):6.1f}us p99={percentile(micros, 99):7.1f}us "
+        f"max={max(micros):8.1f}us  stop={stop_seconds * 1000:8.1f}ms  peak_rss={peak_rss_mb():8.1f}MB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture buffer jitter and memory benchmark")
+    parser.add_argument("--minutes", type=int, nargs="*", default=[1, 10, 60])
+    parser.add_argument("--modes", nargs="*", default=["list", "memory", "mmap"])
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--channels", type=int, default=1)
+    parser.add_argument("--case", nargs=2, metavar=("MODE", "MINUTES"))
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(args.case[0], int(args.case[1]), args.sample_rate, args.channels)
+        return
+
+    # Each case runs in its own interpreter so peak RSS is not shared between cases.
+    for minutes in args.minutes:
+        for mode in args.modes:
+            subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.bench_capture",
+                    "--case", mode, str(minutes),
+                    "--sample-rate", str(args.sample_rate),
+                    "--channels", str(args.channels),
+                ],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+from .common import percentile
+
+SAMPLE_RATE = 16000
+
+
+def write_clip(path, seconds):
+    with wave.open(str(path), "wb") as handle:
+        handle.setnchannels(1)
+        handle.setsampwidth(2)
+        handle.setframerate(SAMPLE_RATE)
+        handle.writeframes(b"\0\0" * int(seconds * SAMPLE_RATE))
+
+
+def run_mode(args, mode, clip):
+    # Fresh client and servers per mode, so no mode starts with another's statistics.
+    from lemonfox_gui.api_client import LemonfoxClient
+    from lemonfox_gui.mock_server import MockLemonfoxServer
+    from lemonfox_gui.settings import AppSettings
+
+    flaky = MockLemonfoxServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.read_timeout * 2,
+        retry_after=0.1,
+        seed=0,
+    )
+    steady = MockLemonfoxServer(latency=args.latency * 1.5, jitter=args.jitter / 4, seed=1)
+    settings = AppSettings(
+        api_base=flaky.url,
+        endpoint_mode="fixed" if mode == "fixed" else "auto",
+        api_endpoints=f"{flaky.url}; eu={steady.url}",
+        eu_only=mode == "eu-only",
+        hedge_requests=mode == "hedged",
+        read_timeout=str(args.read_timeout),
+        max_retries="3",
+    )
+    client = LemonfoxClient(backoff_base=0.1)
+    latencies = []
+    failures = 0
+    for _ in range(args.jobs):
+        started = time.perf_counter()
+        try:
+            client.transcribe(settings, clip, "file")
+        except Exception:
+            failures += 1
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    client.close()
+    flaky.close()
+    steady.close()
+    print(
+        f"{mode:>8} jobs={args.jobs} failed={failures}  p50={percentile(latencies, 50):7.1f}ms "
+        f"p95={percentile(latencies, 95):7.1f}ms max={max(latencies, default=0):7.1f}ms  "
+        f"requests flaky={len(flaky.requests)} steady={len(steady.requests)} "
+        f"extra={len(flaky.requests) + len(steady.requests) - args.jobs}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Endpoint selection and hedging against two mock APIs")
+    parser.add_argument("--modes", nargs="*", default=["fixed", "auto", "hedged", "eu-only"])
+    parser.add_argument("--jobs", type=int, default=40)
+    parser.add_argument("--clip-seconds", type=float, default=5.0)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.15)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--timeout-rate", type=float, default=0.05)
+    parser.add_argument("--read-timeout", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = Path(tmp) / "clip.wav"
+        write_clip(clip, args.clip_seconds)
+        for mode in args.modes:
+            run_mode(args, mode, clip)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from lemonfox_gui.export import EXPORTERS, export_transcript
+
+from .common import peak_rss_mb
+
+WORDS_PER_SEGMENT = 12
+
+
+def synthetic_payload(segments):
+    # Two alternating speakers with word timestamps, ~4 s per segment.
+    items = []
+    for index in range(segments):
+        start = index * 4.0
+        words = [
+            {"word": f"word{n}", "start": round(start + n * 0.3, 3), "end": round(start + n * 0.3 + 0.25, 3)}
+            for n in range(WORDS_PER_SEGMENT)
+        ]
+        items.append({
+            "id": index,
+            "start": start,
+            "end": start + 3.9,
+            "text": " ".join(word["word"] for word in words),
+            "speaker": f"SPEAKER_{(index // 3) % 2:02d}",
+            "words": words,
+        })
+    return {"task": "transcribe", "language": "english", "duration": segments * 4.0, "segments": items}
+
+
+def export_joined(payload, base):
+    # The naive way: build each document as one string, then write it.
+    for name, (suffix, lines) in EXPORTERS.items():
+        text = "".join(lines(payload))
+        Path(str(base) + suffix).write_text(text, encoding="utf-8")
+
+
+def run_case(mode, segments):
+    payload = synthetic_payload(segments)
+    baseline = peak_rss_mb()
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp) / "transcript"
+        started = time.perf_counter()
+        if mode == "joined":
+            export_joined(payload, base)
+        else:
+            export_transcript(payload, base, workers=1 if mode == "sequential" else None)
+        elapsed = time.perf_counter() - started
+        size = sum(path.stat().st_size for path in Path(tmp).iterdir())
+    print(
+        f"{mode:>10} {segments:>6} segments  {elapsed * 1000:8.1f}ms  "
+        f"written={size / 1e6:6.1f}MB  peak_rss={peak_rss_mb():7.1f}MB (+{peak_rss_mb() - baseline:6.1f}MB for export)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-format export benchmark")
+    parser.add_argument("--segments", type=int, nargs="*", default=[1000, 10000])
+    parser.add_argument("--modes", nargs="*", default=["joined", "sequential", "parallel"])
+    parser.add_argument("--case", nargs=2, metavar=("MODE", "SEGMENTS"))
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(args.case[0], int(args.case[1]))
+        return
+
+    # Each case runs in its own interpreter so peak RSS is not shared between cases.
+    for segments in args.segments:
+        for mode in args.modes:
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_export", "--case", mode, str(segments)],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
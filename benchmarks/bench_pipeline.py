@@ -0,0 +1,146 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .common import peak_rss_mb, percentile
+
+SAMPLE_RATE = 16000
+BLOCK_FRAMES = 512
+
+
+def synthetic_block(rng, frames):
+    # Noise bursts over a quiet floor; close enough to speech for the encoder and VAD.
+    t = np.arange(frames) / SAMPLE_RATE
+    tone = 0.2 * np.sin(2 * np.pi * rng.uniform(120, 300) * t)
+    return (tone + 0.01 * rng.standard_normal(frames)).astype("float32")[:, None]
+
+
+def record(path, seconds, rng):
+    # Feeds the capture buffer and streaming writer the way AudioRecorder does,
+    # without waiting for real time to pass.
+    from lemonfox_gui.buffer import CaptureBuffer, CHUNK_SECONDS
+    from lemonfox_gui.writer import StreamWriter
+
+    buffer = CaptureBuffer(1, SAMPLE_RATE * CHUNK_SECONDS)
+    writer = StreamWriter(buffer, path, SAMPLE_RATE)
+    block = synthetic_block(rng, BLOCK_FRAMES * 64)
+    remaining = int(seconds * SAMPLE_RATE)
+    while remaining > 0:
+        piece = block[:remaining]
+        buffer.write(piece)
+        remaining -= len(piece)
+    writer.close()
+    buffer.close()
+
+
+def run_job(settings, workdir, index, seconds):
+    from lemonfox_gui.pipeline import run_transcription
+
+    rng = np.random.default_rng(index)
+    path = Path(workdir) / f"recording_{index:04d}.wav"
+    started = time.perf_counter()
+    record(path, seconds, rng)
+    recorded = time.perf_counter()
+    run_transcription(settings, path, "file")
+    return recorded - started, time.perf_counter() - started
+
+
+def run_case(args, seconds, concurrency):
+    from lemonfox_gui.mock_server import MockLemonfoxServer
+    from lemonfox_gui.settings import AppSettings
+
+    server = MockLemonfoxServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        realtime_factor=args.realtime_factor,
+        bandwidth=args.bandwidth,
+        error_rate=args.error_rate,
+        error_statuses=args.error_statuses,
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds,
+        retry_after=0.1,
+        retry_after_statuses=args.retry_after_statuses,
+        seed=0,
+    )
+    with tempfile.TemporaryDirectory() as workdir:
+        settings = AppSettings(
+            api_base=server.url,
+            response_format=args.response_format,
+            text_dir=workdir,
+            cache_enabled=False,
+            read_timeout=str(max(1, int(args.hang_seconds / 2))),
+            max_retries="5",
+        )
+        latencies = []
+        failures = 0
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [pool.submit(run_job, settings, workdir, index, seconds) for index in range(args.jobs)]
+            for future in futures:
+                try:
+                    latencies.append(future.result())
+                except Exception:
+                    failures += 1
+        wall = time.perf_counter() - started
+    server.close()
+
+    record_ms = [r * 1000 for r, _ in latencies]
+    total_ms = [t * 1000 for _, t in latencies]
+    audio_rate = len(latencies) * seconds / wall
+    faults = ", ".join(f"{name}={count}" for name, count in sorted(server.faults.items(), key=str)) or "none"
+    print(
+        f"{seconds:>5}s audio  x{concurrency:<2} jobs={args.jobs} failed={failures}  "
+        f"record p50={percentile(record_ms, 50):7.1f}ms  "
+        f"end-to-end p50={percentile(total_ms, 50):8.1f}ms p95={percentile(total_ms, 95):8.1f}ms  "
+        f"throughput={len(latencies) / wall:5.2f} jobs/s ({audio_rate:7.1f} audio s/s)  "
+        f"requests={len(server.requests)} faults: {faults}  peak_rss={peak_rss_mb():7.1f}MB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark against the mock API")
+    parser.add_argument("--seconds", type=int, nargs="*", default=[10, 60, 600])
+    parser.add_argument("--concurrency", type=int, nargs="*", default=[1, 4])
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--response-format", default="verbose_json")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--realtime-factor", type=float, default=0.0)
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="bytes per second, 0 = unlimited")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-statuses", type=int, nargs="*", default=[429, 500, 503])
+    # The client retries 429 and a 503 with Retry-After; 500s and stalls fail the job.
+    parser.add_argument("--retry-after-statuses", type=int, nargs="*", default=[429, 503])
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--hang-seconds", type=float, default=4.0)
+    parser.add_argument("--case", nargs=2, type=int, metavar=("SECONDS", "CONCURRENCY"))
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(args, *args.case)
+        return
+
+    # Each case runs in its own interpreter so peak RSS is not shared between cases,
+    # with a throwaway home so the cache and history of the real app stay untouched.
+    passthrough = sys.argv[1:]
+    for seconds in args.seconds:
+        for concurrency in args.concurrency:
+            with tempfile.TemporaryDirectory() as home:
+                env = dict(os.environ, HOME=home, USERPROFILE=home)
+                subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_pipeline", *passthrough,
+                     "--case", str(seconds), str(concurrency)],
+                    check=True,
+                    env=env,
+                )
+
+
+if __name__ == "__main__":
+    main()
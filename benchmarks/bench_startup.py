@@ -0,0 +1,111 @@
+import argparse
+import subprocess
+import sys
+import time
+
+from .common import percentile
+
+TARGET = "lemonfox_gui.ui"
+# None of these may be imported before the window is shown.
+DEFERRED = ("numpy", "sounddevice", "soundfile", "requests")
+
+FIRST_FRAME_SCRIPT = """
+import sys
+from tkinter import Tk, TclError
+try:
+    root = Tk()
+except TclError as exc:
+    print("NODISPLAY", exc, flush=True)
+    sys.exit(0)
+from lemonfox_gui.ui import App
+App(root)
+root.update()
+print("FRAME", flush=True)
+root.destroy()
+"""
+
+
+def import_times(module):
+    # Parses `python -X importtime` output into {name: (self_us, cumulative_us)} for
+    # module and everything it pulls in; interpreter startup (site, ...) is left out.
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    group = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue
+        group[name.strip()] = (int(self_us), int(cumulative_us))
+        # Children are printed before their parent; a top-level line closes the tree.
+        if not name[1:].startswith(" "):
+            if name.strip() == module:
+                return group
+            group = {}
+    return group
+
+
+def deferred_loaded(module):
+    code = f"import sys, {module}; print(' '.join(m for m in {DEFERRED!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def first_frame_ms():
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", FIRST_FRAME_SCRIPT], stdout=subprocess.PIPE, text=True
+    )
+    line = process.stdout.readline()
+    elapsed = (time.perf_counter() - started) * 1000
+    process.wait()
+    if not line.startswith("FRAME"):
+        return None
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time benchmark with regression thresholds")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-import-ms", type=float, default=150.0, help=f"limit for importing {TARGET}")
+    parser.add_argument("--max-first-frame-ms", type=float, default=1500.0)
+    args = parser.parse_args()
+
+    runs = [import_times(TARGET) for _ in range(args.runs)]
+    import_ms = [run[TARGET][1] / 1000 for run in runs if TARGET in run]
+    last = runs[-1]
+    print(f"import {TARGET}: p50={percentile(import_ms, 50):.1f}ms max={max(import_ms):.1f}ms over {args.runs} runs")
+    print(f"{'self ms':>9} {'cumul ms':>9}  module")
+    ranked = sorted(last.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (self_us, cumulative_us) in ranked[:args.top]:
+        print(f"{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {name}")
+
+    failures = []
+    loaded = deferred_loaded(TARGET)
+    if loaded:
+        failures.append(f"{TARGET} eagerly imports {', '.join(loaded)}")
+    if percentile(import_ms, 50) > args.max_import_ms:
+        failures.append(f"import took {percentile(import_ms, 50):.1f}ms > {args.max_import_ms:.0f}ms")
+
+    frames = [first_frame_ms() for _ in range(args.runs)]
+    if any(frame is None for frame in frames):
+        print("time to first frame: skipped (no display)")
+    else:
+        p50 = percentile(frames, 50)
+        print(f"time to first frame: p50={p50:.1f}ms max={max(frames):.1f}ms")
+        if p50 > args.max_first_frame_ms:
+            failures.append(f"first frame took {p50:.1f}ms > {args.max_first_frame_ms:.0f}ms")
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import argparse
+import time
+from tkinter import Tk, Text, END, TclError
+
+from lemonfox_gui.settings import AppSettings
+from lemonfox_gui.transcripts import extract_display_text
+from lemonfox_gui.viewer import TranscriptView
+
+from .common import peak_rss_mb
+
+
+def make_payload(segments, words_per_segment):
+    items = []
+    for index in range(segments):
+        start = index * 4.0
+        words = [
+            {"word": f"word{n}", "start": start + n * 0.3, "end": start + n * 0.3 + 0.25}
+            for n in range(words_per_segment)
+        ]
+        items.append({
+            "start": start,
+            "end": start + 3.5,
+            "speaker": f"SPEAKER_{index % 3:02d}",
+            "text": " ".join(word["word"] for word in words),
+            "words": words,
+        })
+    return {"text": " ".join(item["text"] for item in items), "segments": items}
+
+
+def paint_full(root, settings, payload):
+    # The previous approach: build the whole display string and insert it in one call.
+    text = Text(root, height=18, wrap="word")
+    text.pack()
+    started = time.perf_counter()
+    text.delete(1.0, END)
+    text.insert(END, extract_display_text(settings, payload, None))
+    root.update()
+    first_paint = time.perf_counter() - started
+    text.destroy()
+    return first_paint
+
+
+def paint_virtual(root, settings, payload):
+    view = TranscriptView(root, height=18, wrap="word")
+    view.frame.pack()
+    started = time.perf_counter()
+    view.show(settings, payload, None)
+    root.update()
+    first_paint = time.perf_counter() - started
+    # Let the batched inserts finish filling the window.
+    while view._pending is not None:
+        root.update()
+    filled = time.perf_counter() - started
+    started = time.perf_counter()
+    view.jump_to(payload["segments"][-1]["start"])
+    root.update()
+    jump = time.perf_counter() - started
+    view.frame.destroy()
+    return first_paint, filled, jump
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcript view first-paint benchmark")
+    parser.add_argument("--segments", type=int, nargs="*", default=[1000, 10000])
+    parser.add_argument("--words", type=int, default=12)
+    args = parser.parse_args()
+
+    try:
+        root = Tk()
+    except TclError as exc:
+        raise SystemExit(f"bench_transcript_view needs a display: {exc}")
+    settings = AppSettings(response_format="verbose_json")
+    for segments in args.segments:
+        payload = make_payload(segments, args.words)
+        full = paint_full(root, settings, payload)
+        first, filled, jump = paint_virtual(root, settings, payload)
+        print(
+            f"{segments:>6} segments  full insert={full * 1000:8.1f}ms  "
+            f"virtual first paint={first * 1000:7.1f}ms window filled={filled * 1000:7.1f}ms "
+            f"jump to end={jump * 1000:6.1f}ms  peak_rss={peak_rss_mb():7.1f}MB"
+        )
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
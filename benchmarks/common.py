@@ -0,0 +1,24 @@
+import sys
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            return 0.0
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
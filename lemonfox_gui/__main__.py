@@ -1,13 +1,21 @@
-from tkinter import Tk
+import sys
 
-from lemonfox_gui.ui import App
 
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["batch"]:
+        from lemonfox_gui.cli import batch_main
+
+        return batch_main(argv[1:])
+
+    from tkinter import Tk
+
+    from lemonfox_gui.ui import App
 
-def main():
     root = Tk()
     app = App(root)
     root.mainloop()
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
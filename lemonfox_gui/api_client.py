@@ -1,12 +1,45 @@
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
 import requests
+from requests.adapters import HTTPAdapter
 
-from .settings import AppSettings
+from .jobs import JobCancelled
+from .multipart import MultipartUpload
+from .settings import AppSettings, parse_int
 
+# Answers that mean the request was not processed, so another attempt cannot be billed
+# again. 503 is only retried when it comes with Retry-After.
+RETRY_STATUSES = {408, 425, 429}
+# Answers that count against an endpoint's health.
+FAILURE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 300
+DEFAULT_MAX_RETRIES = 3
+POOL_SIZE = 8
+KNOWN_ENDPOINTS = {"https://api.lemonfox.ai": "", "https://eu-api.lemonfox.ai": "eu"}
+# Rolling statistics per endpoint: the last STATS_WINDOW attempts, none older than STATS_MAX_AGE
+# seconds, so an endpoint that was slow or down gets tried again later.
+STATS_WINDOW = 20
+STATS_MAX_AGE = 600.0
+FAILURE_PENALTY = 4.0
+COOLDOWN_SECONDS = 30.0
+# A hedge is sent once the first request runs longer than the endpoint's p95.
+HEDGE_MIN_SAMPLES = 5
+HEDGE_DEFAULT_DELAY = 3.0
+HEDGE_MIN_DELAY = 0.25
+DEFAULT_HEDGE_MAX_MB = 5
 
-def transcribe_audio(settings: AppSettings, source, source_type: str):
-    url = f"{settings.api_base}/v1/audio/transcriptions"
-    headers = {"Authorization": f"Bearer {settings.api_token}"}
 
+def build_form(settings: AppSettings):
     data_list = [("response_format", settings.response_format)]
     if settings.language:
         data_list.append(("language", settings.language))
@@ -24,22 +57,312 @@ def transcribe_audio(settings: AppSettings, source, source_type: str):
         data_list.append(("timestamp_granularities[]", "word"))
     if settings.callback_url:
         data_list.append(("callback_url", settings.callback_url))
+    return data_list
 
-    files = None
-    if source_type == "url":
-        data_list.append(("file", source))
-    else:
-        files = {"file": open(source, "rb")}
 
+def retry_after_seconds(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
     try:
-        resp = requests.post(url, headers=headers, data=data_list, files=files, timeout=300)
-    finally:
-        if files is not None:
-            files["file"].close()
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def endpoint_region(base: str):
+    if base in KNOWN_ENDPOINTS:
+        return KNOWN_ENDPOINTS[base]
+    return "eu" if (urlsplit(base).hostname or "").startswith("eu-") else ""
+
+
+def parse_endpoints(settings: AppSettings):
+    # Returns the allowed (base, region) pairs, preferred first. "auto" adds the other
+    # Lemonfox region, or the bases listed in api_endpoints ("eu=http://host:port"
+    # tags a base as EU). EU-only never falls back to a non-EU endpoint.
+    entries = [settings.api_base]
+    if settings.endpoint_mode == "auto":
+        extra = [entry.strip() for entry in settings.api_endpoints.replace(",", ";").split(";")]
+        entries += [entry for entry in extra if entry] or list(KNOWN_ENDPOINTS)
+    endpoints = {}
+    for entry in entries:
+        region, _, base = entry.rpartition("=") if "=" in entry else ("", "", entry)
+        base = base.strip().rstrip("/")
+        if base and base not in endpoints:
+            endpoints[base] = region.strip().lower() or endpoint_region(base)
+    allowed = [(base, region) for base, region in endpoints.items() if region == "eu" or not settings.eu_only]
+    if not allowed:
+        raise RuntimeError("EU-only is enabled but no EU endpoint is configured")
+    return allowed
+
+
+class EndpointManager:
+    # Rolling latency/error statistics per API base URL. Latency is counted per MB
+    # uploaded (at least one) so large files do not make an endpoint look slow.
+    def __init__(self, window: int = STATS_WINDOW, max_age: float = STATS_MAX_AGE, clock=time.monotonic):
+        self.window = window
+        self.max_age = max_age
+        self.clock = clock
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, base: str, seconds: float, ok: bool, size=None):
+        cost = seconds / max(1.0, (size or 0) / 1e6)
+        with self._lock:
+            samples = self._samples.setdefault(base, deque(maxlen=self.window))
+            samples.append((self.clock(), cost, ok, size))
+
+    def _recent(self, base):
+        cutoff = self.clock() - self.max_age
+        samples = self._samples.get(base) or ()
+        return [sample for sample in samples if sample[0] >= cutoff]
+
+    def score(self, base: str):
+        # Lower is better. Untried endpoints score 0 so each one is measured once.
+        with self._lock:
+            samples = self._recent(base)
+        if not samples:
+            return 0.0
+        when, _, ok, _ = samples[-1]
+        if not ok and self.clock() - when < COOLDOWN_SECONDS:
+            return float("inf")
+        costs = sorted(cost for _, cost, ok, _ in samples if ok)
+        if not costs:
+            return float("inf")
+        error_rate = sum(1 for sample in samples if not sample[2]) / len(samples)
+        return costs[len(costs) // 2] * (1 + FAILURE_PENALTY * error_rate)
+
+    def route(self, settings: AppSettings):
+        # Allowed bases, healthiest first; ties keep the configured order.
+        bases = [base for base, _ in parse_endpoints(settings)]
+        if len(bases) == 1:
+            return bases
+        order = {base: index for index, base in enumerate(bases)}
+        return sorted(bases, key=lambda base: (self.score(base), order[base]))
+
+    def hedge_delay(self, base: str, max_bytes: int):
+        # p95 of recent successful requests no larger than the hedging limit.
+        with self._lock:
+            seconds = sorted(
+                cost for _, cost, ok, size in self._recent(base) if ok and (size or 0) <= max_bytes
+            )
+        if len(seconds) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return max(HEDGE_MIN_DELAY, seconds[min(len(seconds) - 1, round(0.95 * (len(seconds) - 1)))])
+
+
+class _Either:
+    # Cancel signal of one hedged request: the job was cancelled or another request won.
+    def __init__(self, *events):
+        self.events = [event for event in events if event is not None]
+
+    def is_set(self):
+        return any(event.is_set() for event in self.events)
+
+    def wait(self, timeout):
+        deadline = time.monotonic() + timeout
+        while not self.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(0.05, remaining))
+        return True
+
+
+class LemonfoxClient:
+    def __init__(self, pool_size: int = POOL_SIZE, backoff_base: float = 1.0, backoff_cap: float = 30.0):
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.endpoints = EndpointManager()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def backoff(self, attempt: int, retry_after=None):
+        if retry_after is not None:
+            return min(retry_after, self.backoff_cap)
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _wait(self, seconds, cancel):
+        if cancel is None:
+            time.sleep(seconds)
+        elif cancel.wait(seconds):
+            raise JobCancelled("Cancelled")
+
+    def transcribe(self, settings: AppSettings, source, source_type: str, progress=None, cancel=None):
+        routes = self.endpoints.route(settings)
+        key = str(uuid.uuid4())
+        if self._should_hedge(settings, routes, source, source_type):
+            resp = self._hedged(settings, routes, key, source, source_type, progress, cancel)
+        else:
+            resp = self._request(settings, routes[0], key, source, source_type, progress, cancel)
+
+        if not resp.ok:
+            raise RuntimeError(f"API error {resp.status_code}: {resp.text}")
+
+        if settings.callback_url:
+            # The transcript is posted to callback_url later; this is only the acknowledgement.
+            return None, resp.text
+
+        if settings.response_format in ("json", "verbose_json"):
+            return resp.json(), None
+        return None, resp.text
+
+    def _request(self, settings: AppSettings, base: str, key: str, source, source_type: str, progress, cancel):
+        # Sends with retries. A failed attempt is recorded against its endpoint, so the
+        # retry goes to the healthiest endpoint left (the same one if it is the only one).
+        # Nothing is retried once the server may be transcribing the audio: the API does
+        # not document request deduplication, so that could be billed twice.
+        headers = {
+            "Authorization": f"Bearer {settings.api_token}",
+            # Undocumented by the API; lets a server or proxy that supports it recognise attempts.
+            "Idempotency-Key": key,
+        }
+        data_list = build_form(settings)
+        if source_type == "url":
+            data_list.append(("file", source))
+        timeout = (
+            parse_int(settings.connect_timeout, DEFAULT_CONNECT_TIMEOUT),
+            parse_int(settings.read_timeout, DEFAULT_READ_TIMEOUT),
+        )
+        max_retries = max(0, parse_int(settings.max_retries, DEFAULT_MAX_RETRIES))
+
+        attempt = 0
+        while True:
+            url = f"{base}/v1/audio/transcriptions"
+            if source_type == "url":
+                body = data_list
+                request_headers = headers
+                size = None
+            else:
+                body = MultipartUpload(data_list, "file", source, progress=progress, cancel=cancel)
+                request_headers = dict(headers, **{"Content-Type": body.content_type})
+                size = len(body)
+            started = time.monotonic()
+            try:
+                resp = self.session.post(url, headers=request_headers, data=body, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if cancel is not None and cancel.is_set():
+                    raise JobCancelled("Cancelled") from exc
+                self.endpoints.record(base, time.monotonic() - started, False, size)
+                if self._delivered(exc, body, size):
+                    raise RuntimeError(
+                        f"No answer after the upload completed, not retried as it may already be "
+                        f"transcribing: {exc}"
+                    ) from exc
+                if attempt >= max_retries:
+                    raise RuntimeError(f"Request failed after {attempt + 1} attempts: {exc}") from exc
+                self._wait(self.backoff(attempt), cancel)
+                attempt += 1
+                base = self.endpoints.route(settings)[0]
+                continue
+            finally:
+                if source_type != "url":
+                    body.close()
+
+            failed = resp.status_code in FAILURE_STATUSES
+            if failed or resp.ok:
+                self.endpoints.record(base, time.monotonic() - started, not failed, size)
+            retry = resp.status_code in RETRY_STATUSES or (
+                resp.status_code == 503 and resp.headers.get("Retry-After") is not None
+            )
+            if retry and attempt < max_retries:
+                self._wait(self.backoff(attempt, retry_after_seconds(resp.headers.get("Retry-After"))), cancel)
+                attempt += 1
+                base = self.endpoints.route(settings)[0]
+                continue
+            return resp
+
+    def _delivered(self, exc, body, size):
+        # Whether the whole request reached the server before the error. An upload is
+        # tracked by the bytes handed to the socket; a URL job's small form counts as
+        # delivered once the connection stands and only the answer is missing.
+        if isinstance(exc, requests.ConnectTimeout):
+            return False
+        if size is not None:
+            return body.bytes_sent >= size
+        return isinstance(exc, (requests.ReadTimeout, requests.exceptions.ChunkedEncodingError))
+
+    def _should_hedge(self, settings: AppSettings, routes, source, source_type: str):
+        # Only short uploads: a hedge may be billed twice, and a callback job would be
+        # answered twice. URL jobs make the server download the audio, so they never hedge.
+        if not settings.hedge_requests or len(routes) < 2 or settings.callback_url or source_type == "url":
+            return False
+        return os.path.getsize(source) <= self._hedge_max_bytes(settings)
+
+    def _hedge_max_bytes(self, settings: AppSettings):
+        return parse_int(settings.hedge_max_mb, DEFAULT_HEDGE_MAX_MB) * 1_000_000
+
+    def _hedged(self, settings: AppSettings, routes, key: str, source, source_type: str, progress, cancel):
+        # Sends to the best endpoint; if it has not answered after its p95 latency, sends
+        # the same request to the next one. The first success wins, the other is cancelled
+        # (an upload stops at once, a request already waiting for its answer is dropped).
+        won = threading.Event()
+        outcomes = queue.SimpleQueue()
+
+        def send(base, report):
+            try:
+                outcomes.put((self._request(settings, base, key, source, source_type, report, _Either(cancel, won)), None))
+            except Exception as exc:
+                outcomes.put((None, exc))
+
+        threading.Thread(target=send, args=(routes[0], progress), daemon=True).start()
+        hedge_at = time.monotonic() + self.endpoints.hedge_delay(routes[0], self._hedge_max_bytes(settings))
+        pending = 1
+        hedged = False
+        failure = None
+        try:
+            while pending:
+                # Short waits so a cancel is noticed while both requests wait for an answer.
+                wait = 0.1 if hedged else min(0.1, max(0.0, hedge_at - time.monotonic()))
+                try:
+                    resp, error = outcomes.get(timeout=wait)
+                except queue.Empty:
+                    if cancel is not None and cancel.is_set():
+                        raise JobCancelled("Cancelled")
+                    if not hedged and time.monotonic() >= hedge_at:
+                        hedged = True
+                        threading.Thread(target=send, args=(routes[1], None), daemon=True).start()
+                        pending += 1
+                    continue
+                pending -= 1
+                if resp is not None and resp.ok:
+                    return resp
+                if failure is None or isinstance(failure[1], JobCancelled):
+                    failure = (resp, error)
+                if not hedged:
+                    break
+        finally:
+            won.set()
+        if cancel is not None and cancel.is_set():
+            raise JobCancelled("Cancelled")
+        resp, error = failure
+        if error is not None:
+            raise error
+        return resp
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LemonfoxClient()
+        return _client
 
-    if not resp.ok:
-        raise RuntimeError(f"API error {resp.status_code}: {resp.text}")
 
-    if settings.response_format in ("json", "verbose_json"):
-        return resp.json(), None
-    return None, resp.text
+def transcribe_audio(settings: AppSettings, source, source_type: str, progress=None, cancel=None):
+    return get_client().transcribe(settings, source, source_type, progress=progress, cancel=cancel)
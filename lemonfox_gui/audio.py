@@ -1,37 +1,222 @@
+import queue
 import threading
+import time
 
 import numpy as np
 import sounddevice as sd
 
+from .buffer import CaptureBuffer, CHUNK_SECONDS
+from .dsp import Resampler, downmix, to_float, to_pcm16
+from .writer import StreamWriter
+
+CAPTURE_FORMATS = ("int16", "float32")
+DEVICE_RATES = (8000, 16000, 22050, 32000, 44100, 48000, 96000)
+
+
+def _supported(device, rate, channels, dtype):
+    try:
+        sd.check_input_settings(device=device, samplerate=rate, channels=channels, dtype=dtype)
+    except Exception:
+        return False
+    return True
+
+
+def supported_rates(device=None, channels: int = 1, dtype: str = "float32"):
+    return [rate for rate in DEVICE_RATES if _supported(device, rate, channels, dtype)]
+
+
+def plan_capture(sample_rate: int, channels: int, dtype: str = "int16", device=None):
+    # Returns the (rate, channels, dtype) to open the device with. The requested format
+    # is used directly when the device accepts it; otherwise the device runs at a rate
+    # it supports and CaptureConverter resamples/downmixes to what was asked for.
+    if dtype not in CAPTURE_FORMATS:
+        raise ValueError(f"Unknown capture format: {dtype}")
+    if _supported(device, sample_rate, channels, dtype):
+        return sample_rate, channels, dtype
+    candidates = [channels, 2] if channels == 1 else [channels]
+    for device_channels in candidates:
+        rates = supported_rates(device, device_channels, "float32")
+        if not rates:
+            continue
+        if sample_rate in rates:
+            return sample_rate, device_channels, "float32"
+        # Prefer the closest rate above the target so resampling only ever decimates.
+        higher = [rate for rate in rates if rate > sample_rate]
+        return (higher[0] if higher else rates[-1]), device_channels, "float32"
+    raise ValueError(f"The input device supports neither {sample_rate} Hz nor any standard rate with {channels} channel(s)")
+
+
+class CaptureConverter:
+    # Converts device blocks to the recording format (downmix, streaming resample,
+    # int16) on its own thread so the PortAudio callback only has to copy.
+    def __init__(self, buffer, source_rate: int, target_rate: int, source_channels: int):
+        self.error = None
+        self._buffer = buffer
+        self._mono = buffer.channels == 1 and source_channels > 1
+        self._pcm16 = buffer.dtype == np.int16
+        self._resampler = Resampler(source_rate, target_rate, buffer.channels)
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def put(self, block):
+        self._queue.put(block.copy())
+
+    def _store(self, block):
+        if len(block):
+            self._buffer.write(to_pcm16(block) if self._pcm16 else block)
+
+    def _run(self):
+        try:
+            while True:
+                block = self._queue.get()
+                if block is None:
+                    return
+                block = to_float(block)
+                if self._mono:
+                    block = downmix(block)
+                self._store(self._resampler.process(block))
+        except Exception as exc:
+            self.error = exc
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        if self.error is None:
+            self._store(self._resampler.flush())
+        if self.error is not None:
+            raise RuntimeError(f"Converting captured audio failed: {self.error}")
+
+
+class CaptureTrack:
+    # One recorded signal: capture buffer, optional streaming writer and, when the
+    # device format differs from the recording format, a converter in front of them.
+    def __init__(
+        self, sample_rate: int, channels: int, dtype, device_format, spill_dir=None, output_path=None, file_format="WAV"
+    ):
+        self.buffer = CaptureBuffer(channels, sample_rate * CHUNK_SECONDS, dtype=dtype, spill_dir=spill_dir)
+        self.writer = None
+        self.converter = None
+        if output_path is not None:
+            self.writer = StreamWriter(self.buffer, output_path, sample_rate, file_format)
+        device_rate, device_channels, _ = device_format
+        if device_format != (sample_rate, channels, dtype):
+            self.converter = CaptureConverter(self.buffer, device_rate, sample_rate, device_channels)
+            self.write = self.converter.put
+        else:
+            self.write = self.buffer.write
+
+    def pad(self, frames: int):
+        # Leading silence that lines this track up with tracks that started earlier.
+        if frames > 0:
+            self.buffer.write(np.zeros((frames, self.buffer.channels), dtype=self.buffer.dtype))
+
+    def close(self):
+        try:
+            if self.converter is not None:
+                converter, self.converter = self.converter, None
+                converter.close()
+        finally:
+            if self.writer is not None:
+                writer, self.writer = self.writer, None
+                if writer.close() == 0:
+                    writer.path.unlink(missing_ok=True)
+        # The recording is on disk now; the buffer is only read lazily (live mode) and
+        # never copied into one array, so stopping costs the same for any length.
+        return self.buffer.frames
+
+    def discard(self):
+        if self.converter is not None:
+            self.converter.close()
+            self.converter = None
+        if self.writer is not None:
+            self.writer.close()
+            self.writer.path.unlink(missing_ok=True)
+            self.writer = None
+        self.buffer.close()
+
+
+def parse_device(value):
+    # Empty means the system default input; digits are a PortAudio device index and
+    # anything else a (partial) device name, as sounddevice accepts it.
+    value = (value or "").strip()
+    if not value:
+        return None
+    return int(value) if value.isdigit() else value
+
+
+def parse_tracks(value: str):
+    # "Mic A; Mic B" records one device per track, "Scarlett#1; Scarlett#2" two
+    # channels (1-based) of one interface. Returns (device, 0-based channel) pairs.
+    tracks = []
+    for entry in (value or "").split(";"):
+        entry = entry.strip()
+        if not entry:
+            continue
+        device, _, channel = entry.rpartition("#") if "#" in entry else (entry, "", "1")
+        tracks.append((parse_device(device), int(channel) - 1))
+    return tracks
+
+
+def input_devices():
+    return [device["name"] for device in sd.query_devices() if device["max_input_channels"] > 0]
+
 
 class AudioRecorder:
     def __init__(self):
         self._stream = None
-        self._frames = []
+        self._track = None
         self._recording = False
         self._lock = threading.Lock()
+        self.sample_rate = None
+        self.device_format = None
 
-    def start(self, sample_rate: int, channels: int):
+    def start(
+        self,
+        sample_rate: int,
+        channels: int,
+        spill_dir=None,
+        output_path=None,
+        file_format="WAV",
+        dtype="float32",
+        device=None,
+    ):
         with self._lock:
             if self._recording:
                 return
-            self._frames = []
+            device_format = plan_capture(sample_rate, channels, dtype, device)
+            device_rate, device_channels, device_dtype = device_format
+            if self._track is not None:
+                self._track.buffer.close()
+            self._track = CaptureTrack(sample_rate, channels, dtype, device_format, spill_dir, output_path, file_format)
+            self.sample_rate = sample_rate
+            self.device_format = device_format
             self._recording = True
 
+            write = self._track.write
+
             def callback(indata, frames, time_info, status):
                 if status:
                     pass
-                self._frames.append(indata.copy())
+                write(indata)
 
-            self._stream = sd.InputStream(
-                samplerate=sample_rate,
-                channels=channels,
-                dtype="float32",
-                callback=callback,
-            )
-            self._stream.start()
+            try:
+                self._stream = sd.InputStream(
+                    samplerate=device_rate,
+                    channels=device_channels,
+                    dtype=device_dtype,
+                    device=device,
+                    callback=callback,
+                )
+                self._stream.start()
+            except Exception:
+                self._recording = False
+                self._stream = None
+                self._track.discard()
+                raise
 
     def stop(self):
+        # Returns the number of recorded frames. The buffer stays until release().
         with self._lock:
             if not self._recording:
                 return None
@@ -40,10 +225,122 @@ class AudioRecorder:
                 self._stream.stop()
                 self._stream.close()
                 self._stream = None
-            if not self._frames:
+            return self._track.close()
+
+    def release(self):
+        # Frees the capture buffer and deletes its spill file. Called once the live
+        # session (if any) has read the last utterance; the writer is done after stop().
+        with self._lock:
+            if self._recording or self._track is None:
+                return
+            track, self._track = self._track, None
+            track.buffer.close()
+
+    @property
+    def buffer(self):
+        return self._track.buffer if self._track is not None else None
+
+    @property
+    def recording(self):
+        with self._lock:
+            return self._recording
+
+
+class MultiTrackRecorder:
+    # Records several mono tracks at once: one per device, or one per channel of a
+    # multi-channel interface. Devices are opened as separate streams; each track is
+    # padded with the time its stream started late so all tracks share one zero.
+    def __init__(self):
+        self._streams = []
+        self._tracks = []
+        self._recording = False
+        self._lock = threading.Lock()
+        self.sample_rate = None
+
+    def start(self, sample_rate: int, tracks, output_paths, spill_dir=None, file_format="WAV", dtype="int16"):
+        # tracks is a list of (device, 0-based channel), output_paths one path per track.
+        with self._lock:
+            if self._recording:
+                return
+            routes = {}
+            for index, (device, channel) in enumerate(tracks):
+                routes.setdefault(device, []).append((index, channel))
+            # Validate every device before anything is allocated or opened.
+            formats = {
+                device: plan_capture(sample_rate, max(channel for _, channel in entries) + 1, dtype, device)
+                for device, entries in routes.items()
+            }
+            for track in self._tracks:
+                track.buffer.close()
+            self._tracks = [None] * len(tracks)
+            for device, entries in routes.items():
+                rate, _, device_dtype = formats[device]
+                for index, _ in entries:
+                    self._tracks[index] = CaptureTrack(
+                        sample_rate, 1, dtype, (rate, 1, device_dtype), spill_dir, output_paths[index], file_format
+                    )
+            self.sample_rate = sample_rate
+            try:
+                for device, entries in routes.items():
+                    targets = [(self._tracks[index], channel) for index, channel in entries]
+                    self._streams.append(self._open(device, formats[device], targets))
+                self._started = time.monotonic()
+                for stream in self._streams:
+                    stream.start()
+            except Exception:
+                self._close_streams()
+                for track in self._tracks:
+                    track.discard()
+                raise
+            self._recording = True
+
+    def _open(self, device, device_format, targets):
+        rate, channels, dtype = device_format
+        first = [True]
+
+        def callback(indata, frames, time_info, status):
+            if first[0]:
+                first[0] = False
+                # indata was captured before this callback ran; pad up to its first frame.
+                lead = time.monotonic() - frames / rate - self._started
+                for track, _ in targets:
+                    track.pad(round(max(0.0, lead) * self.sample_rate))
+            for track, channel in targets:
+                track.write(indata[:, channel:channel + 1])
+
+        return sd.InputStream(samplerate=rate, channels=channels, dtype=dtype, device=device, callback=callback)
+
+    def _close_streams(self):
+        for stream in self._streams:
+            stream.stop()
+            stream.close()
+        self._streams = []
+
+    def stop(self):
+        # Returns the recorded frame count of every track, in track order. Nothing reads
+        # the buffers once the writers are closed, so they are freed here.
+        with self._lock:
+            if not self._recording:
                 return None
-            data = np.concatenate(self._frames, axis=0)
-            return data
+            self._recording = False
+            self._close_streams()
+            errors = []
+            frames = []
+            for track in self._tracks:
+                try:
+                    frames.append(track.close())
+                except RuntimeError as exc:
+                    errors.append(str(exc))
+                    frames.append(None)
+                finally:
+                    track.buffer.close()
+            if errors:
+                raise RuntimeError(errors[0])
+            return frames
+
+    @property
+    def buffers(self):
+        return [track.buffer for track in self._tracks]
 
     @property
     def recording(self):
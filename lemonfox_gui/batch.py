@@ -0,0 +1,114 @@
+import glob
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+import soundfile as sf
+
+from .jobs import JobCancelled
+from .metrics import log_metrics
+from .pipeline import run_transcription
+from .settings import AppSettings
+from .transcripts import transcribed_sources
+
+AUDIO_EXTENSIONS = {
+    ".wav", ".mp3", ".m4a", ".aac", ".flac", ".ogg", ".opus", ".webm", ".mp4", ".mov", ".mpeg",
+}
+
+
+@dataclass
+class BatchStats:
+    files: int = 0
+    done: int = 0
+    skipped: int = 0
+    failed: int = 0
+    audio_seconds: float = 0.0
+    bytes_uploaded: int = 0
+    wall_seconds: float = 0.0
+
+    def summary(self):
+        minutes = self.wall_seconds / 60
+        files_per_min = self.done / minutes if minutes else 0.0
+        audio_rate = self.audio_seconds / self.wall_seconds if self.wall_seconds else 0.0
+        return (
+            f"{self.done}/{self.files} transcribed, {self.skipped} skipped, {self.failed} failed "
+            f"in {self.wall_seconds:.1f}s | {files_per_min:.1f} files/min, "
+            f"{audio_rate:.1f} audio-hours/hour, {self.bytes_uploaded / 1e6:.1f} MB uploaded"
+        )
+
+
+def collect_files(targets):
+    files = []
+    for target in targets:
+        path = Path(target)
+        if path.is_dir():
+            candidates = sorted(p for p in path.rglob("*") if p.is_file())
+        elif path.is_file():
+            candidates = [path]
+        else:
+            candidates = sorted(Path(p) for p in glob.glob(str(target), recursive=True))
+        files.extend(p for p in candidates if p.suffix.lower() in AUDIO_EXTENSIONS)
+    seen = set()
+    unique = []
+    for path in files:
+        key = path.resolve()
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+def audio_seconds(path):
+    try:
+        return sf.info(path).duration
+    except sf.LibsndfileError:
+        return 0.0
+
+
+def run_batch(settings: AppSettings, files, concurrency: int = 4, skip_existing=True, progress=None, cancel=None):
+    report = progress or (lambda message: None)
+    stats = BatchStats(files=len(files))
+    started = time.perf_counter()
+
+    existing = transcribed_sources(settings) if skip_existing else set()
+    pending = []
+    for path in files:
+        if str(path) in existing or str(path.resolve()) in existing:
+            stats.skipped += 1
+        else:
+            pending.append(path)
+    if stats.skipped:
+        report(f"Skipping {stats.skipped} files that already have transcripts")
+
+    def run(path):
+        if cancel is not None and cancel.is_set():
+            raise JobCancelled("Cancelled")
+        result = run_transcription(settings, path.resolve(), "file", cancel=cancel, force=not skip_existing)
+        if settings.metrics_log:
+            log_metrics(result["metrics"].record("done", batch=True))
+        info = result["upload_info"] or {}
+        return audio_seconds(path), info.get("upload_bytes", path.stat().st_size)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {pool.submit(run, path): path for path in pending}
+        try:
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    seconds, uploaded = future.result()
+                except JobCancelled:
+                    raise
+                except Exception as exc:
+                    stats.failed += 1
+                    report(f"FAILED {path}: {exc}")
+                    continue
+                stats.done += 1
+                stats.audio_seconds += seconds
+                stats.bytes_uploaded += uploaded
+                report(f"[{stats.done + stats.failed}/{len(pending)}] {path}")
+        except JobCancelled:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+    stats.wall_seconds = time.perf_counter() - started
+    return stats
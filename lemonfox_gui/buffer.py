@@ -0,0 +1,87 @@
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+CHUNK_SECONDS = 30
+
+
+class CaptureBuffer:
+    def __init__(self, channels: int, chunk_frames: int, dtype="float32", spill_dir=None):
+        self.channels = channels
+        self.chunk_frames = chunk_frames
+        self.dtype = np.dtype(dtype)
+        self._chunk_bytes = chunk_frames * channels * self.dtype.itemsize
+        self._spill_path = None
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+            fd, self._spill_path = tempfile.mkstemp(prefix="capture_", suffix=".raw", dir=spill_dir)
+            os.close(fd)
+        self._chunks = [self._allocate(0)]
+        self._spare = (1, self._allocate(1))
+        self._frames = 0
+        self._closed = False
+        self._need_spare = threading.Event()
+        self._allocator = threading.Thread(target=self._allocate_loop, daemon=True)
+        self._allocator.start()
+
+    @property
+    def frames(self):
+        return self._frames
+
+    def _allocate(self, index):
+        shape = (self.chunk_frames, self.channels)
+        if self._spill_path is None:
+            return np.empty(shape, dtype=self.dtype)
+        return np.memmap(self._spill_path, dtype=self.dtype, mode="r+", offset=index * self._chunk_bytes, shape=shape)
+
+    def _allocate_loop(self):
+        while True:
+            self._need_spare.wait()
+            self._need_spare.clear()
+            if self._closed:
+                return
+            index = len(self._chunks)
+            if self._spare is None or self._spare[0] < index:
+                self._spare = (index, self._allocate(index))
+
+    def write(self, block):
+        # Called from the PortAudio callback: copies into preallocated chunks, the
+        # next chunk is prepared by the allocator thread so this path does not allocate.
+        count = len(block)
+        offset = 0
+        while offset < count:
+            index, pos = divmod(self._frames, self.chunk_frames)
+            if index == len(self._chunks):
+                spare = self._spare
+                if spare is not None and spare[0] == index:
+                    chunk = spare[1]
+                else:
+                    chunk = self._allocate(index)
+                self._spare = None
+                self._chunks.append(chunk)
+                self._need_spare.set()
+            take = min(count - offset, self.chunk_frames - pos)
+            self._chunks[index][pos:pos + take] = block[offset:offset + take]
+            offset += take
+            self._frames += take
+
+    def read(self, start, stop):
+        while start < stop:
+            index, pos = divmod(start, self.chunk_frames)
+            take = min(stop - start, self.chunk_frames - pos)
+            yield self._chunks[index][pos:pos + take]
+            start += take
+
+    def close(self):
+        self._closed = True
+        self._need_spare.set()
+        self._chunks = []
+        self._spare = None
+        if self._spill_path is not None:
+            try:
+                os.remove(self._spill_path)
+            except OSError:
+                pass
+            self._spill_path = None
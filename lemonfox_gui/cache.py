@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from .settings import AppSettings, parse_int, APP_DIR
+
+CACHE_DIR = APP_DIR / "cache"
+INDEX_NAME = "index.json"
+HASH_BLOCK = 1024 * 1024
+# Everything in the request that changes the transcript the API returns.
+KEY_FIELDS = (
+    "response_format",
+    "language",
+    "prompt",
+    "translate",
+    "speaker_labels",
+    "min_speakers",
+    "max_speakers",
+    "word_timestamps",
+)
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        while True:
+            block = handle.read(HASH_BLOCK)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(settings: AppSettings, path):
+    options = {name: getattr(settings, name) for name in KEY_FIELDS}
+    if not settings.speaker_labels:
+        options["min_speakers"] = options["max_speakers"] = ""
+    if settings.response_format != "verbose_json":
+        options["word_timestamps"] = False
+    if settings.trim_silence:
+        options["trim"] = [settings.trim_min_gap_ms, settings.trim_keep_ms]
+    request = hashlib.sha256(json.dumps(options, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"{file_digest(path)}-{request[:16]}"
+
+
+class TranscriptCache:
+    def __init__(self, directory, max_bytes: int, max_age_seconds: float):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    def _load_index(self):
+        path = self.directory / INDEX_NAME
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / INDEX_NAME
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._index, ensure_ascii=True), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _entry_path(self, key):
+        return self.directory / f"{key}.json"
+
+    def _drop(self, key):
+        self._index.pop(key, None)
+        self._entry_path(key).unlink(missing_ok=True)
+
+    def _evict(self):
+        now = time.time()
+        for key, meta in list(self._index.items()):
+            if now - meta["created"] > self.max_age_seconds:
+                self._drop(key)
+        total = sum(meta["size"] for meta in self._index.values())
+        for key, meta in sorted(self._index.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= meta["size"]
+            self._drop(key)
+
+    def get(self, key):
+        with self._lock:
+            meta = self._index.get(key)
+            if meta is None:
+                return None
+            if time.time() - meta["created"] > self.max_age_seconds:
+                self._drop(key)
+                self._save_index()
+                return None
+            try:
+                entry = json.loads(self._entry_path(key).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._drop(key)
+                self._save_index()
+                return None
+            meta["last_used"] = time.time()
+            self._save_index()
+        return entry["payload"], entry["response_text"]
+
+    def put(self, key, payload, response_text, source=None):
+        content = json.dumps({"payload": payload, "response_text": response_text}, ensure_ascii=True)
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._entry_path(key).write_text(content, encoding="utf-8")
+            now = time.time()
+            self._index[key] = {
+                "size": len(content),
+                "created": now,
+                "last_used": now,
+                "source": str(source) if source is not None else "",
+            }
+            self._evict()
+            self._save_index()
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._index):
+                self._drop(key)
+            self._save_index()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def open_cache(settings: AppSettings, directory=CACHE_DIR):
+    max_bytes = parse_int(settings.cache_max_mb, 500) * 1024 * 1024
+    max_age = parse_int(settings.cache_max_days, 90) * 86400
+    with _caches_lock:
+        cache = _caches.get(str(directory))
+        if cache is None:
+            cache = TranscriptCache(directory, max_bytes, max_age)
+            _caches[str(directory)] = cache
+        cache.max_bytes = max_bytes
+        cache.max_age_seconds = max_age
+        return cache
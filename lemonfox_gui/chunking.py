@@ -0,0 +1,213 @@
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+from .api_client import transcribe_audio
+from .dsp import frame_rms
+from .encode import UPLOAD_CODECS, encode_range
+from .formats import render_verbose
+from .jobs import JobCancelled
+from .settings import AppSettings, parse_int
+
+UPLOAD_LIMIT_BYTES = 100 * 1024 * 1024
+# PCM16 upper bound for a chunk so even an uncompressed chunk fits under the limit.
+CHUNK_BYTES_BUDGET = 90 * 1024 * 1024
+ENERGY_FRAME_SECONDS = 0.02
+PAUSE_SECONDS = 0.4
+SEARCH_FRACTION = 0.2
+
+
+def chunk_seconds(settings: AppSettings, rate: int, channels: int):
+    seconds = parse_int(settings.chunk_minutes, 10) * 60
+    if seconds <= 0:
+        seconds = 10 * 60
+    out_rate = 16000 if settings.upload_resample else rate
+    out_channels = 1 if settings.upload_mono else channels
+    return min(seconds, CHUNK_BYTES_BUDGET // (out_rate * out_channels * 2))
+
+
+def needs_chunking(settings: AppSettings, path):
+    path = Path(path)
+    try:
+        info = sf.info(path)
+    except sf.LibsndfileError:
+        return False
+    if path.stat().st_size > UPLOAD_LIMIT_BYTES:
+        return True
+    if parse_int(settings.chunk_minutes, 0) <= 0:
+        return False
+    return info.duration > chunk_seconds(settings, info.samplerate, info.channels)
+
+
+def energy_profile(source, frame_len: int):
+    source.seek(0)
+    parts = [
+        frame_rms(block, frame_len)
+        for block in source.blocks(frame_len * 4096, dtype="float32", always_2d=True)
+    ]
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.float32)
+
+
+def plan_chunks(source, seconds: float, overlap: float):
+    rate = source.samplerate
+    total = source.frames
+    size = int(seconds * rate)
+    if total <= size:
+        return [{"index": 0, "start": 0, "end": total, "cut_start": 0, "cut_end": total}]
+
+    # Cut inside the quietest stretch shortly before each nominal boundary.
+    frame_len = max(1, int(ENERGY_FRAME_SECONDS * rate))
+    energy = energy_profile(source, frame_len)
+    window = max(1, int(PAUSE_SECONDS / ENERGY_FRAME_SECONDS))
+    smooth = np.convolve(energy, np.ones(window, dtype=np.float32) / window, mode="same")
+    search = int(size * SEARCH_FRACTION)
+    cuts = [0]
+    while total - cuts[-1] > size:
+        target = cuts[-1] + size
+        lo = (target - search) // frame_len
+        hi = target // frame_len
+        if hi > lo and hi <= len(smooth):
+            cuts.append(int((lo + np.argmin(smooth[lo:hi])) * frame_len + frame_len // 2))
+        else:
+            cuts.append(target)
+    cuts.append(total)
+
+    pad = int(overlap * rate / 2)
+    return [
+        {
+            "index": index,
+            "start": max(0, cut_start - pad),
+            "end": min(total, cut_end + pad),
+            "cut_start": cut_start,
+            "cut_end": cut_end,
+        }
+        for index, (cut_start, cut_end) in enumerate(zip(cuts, cuts[1:]))
+    ]
+
+
+def _normalized(text):
+    return " ".join((text or "").lower().split())
+
+
+def _shift_words(words, offset, lo, hi):
+    shifted = []
+    for word in words or []:
+        start = word.get("start", 0) + offset
+        end = word.get("end", start) + offset
+        if lo <= (start + end) / 2 < hi:
+            shifted.append(dict(word, start=round(start, 3), end=round(end, 3)))
+    return shifted
+
+
+def stitch(plan, payloads, rate: int, total_frames: int):
+    segments = []
+    words = []
+    language = None
+    last = len(plan) - 1
+    for chunk, payload in zip(plan, payloads):
+        language = language or payload.get("language")
+        offset = chunk["start"] / rate
+        lo = chunk["cut_start"] / rate
+        hi = chunk["cut_end"] / rate if chunk["index"] < last else float("inf")
+        for seg in payload.get("segments", []):
+            start = seg.get("start", 0) + offset
+            end = seg.get("end", start) + offset
+            if not lo <= (start + end) / 2 < hi:
+                continue
+            # Overlap windows are cut at the midpoint, but a sentence that straddles
+            # the cut can still come back from both chunks.
+            if segments and start < segments[-1]["end"] and _normalized(seg.get("text")) == _normalized(
+                segments[-1].get("text")
+            ):
+                continue
+            shifted = dict(seg, id=len(segments), start=round(start, 3), end=round(end, 3))
+            if "words" in seg:
+                shifted["words"] = _shift_words(seg["words"], offset, lo, hi)
+            segments.append(shifted)
+        words.extend(_shift_words(payload.get("words"), offset, lo, hi))
+
+    merged = {
+        "text": " ".join(seg.get("text", "").strip() for seg in segments).strip(),
+        "duration": round(total_frames / rate, 3),
+        "segments": segments,
+    }
+    if language:
+        merged["language"] = language
+    if words:
+        merged["words"] = words
+    return merged
+
+
+def transcribe_chunked(settings: AppSettings, path, progress=None, cancel=None):
+    path = Path(path)
+    codec = settings.upload_codec if settings.upload_codec in UPLOAD_CODECS else "flac"
+    suffix = UPLOAD_CODECS[codec][2]
+    chunk_settings = replace(settings, response_format="verbose_json", upload_codec=codec)
+    workers = max(1, parse_int(settings.chunk_workers, 4))
+    started = time.perf_counter()
+
+    with sf.SoundFile(path) as source:
+        rate = source.samplerate
+        total = source.frames
+        seconds = chunk_seconds(settings, rate, source.channels)
+        plan = plan_chunks(source, seconds, parse_int(settings.chunk_overlap, 2))
+
+    with tempfile.TemporaryDirectory(prefix="lemonfox_chunks_") as tmp:
+
+        def run(chunk):
+            if cancel is not None and cancel.is_set():
+                raise JobCancelled("Cancelled")
+            chunk_started = time.perf_counter()
+            chunk_path = Path(tmp) / f"chunk_{chunk['index']:04d}{suffix}"
+            with sf.SoundFile(path) as source:
+                encode_range(chunk_settings, source, chunk_path, codec, chunk["start"], chunk["end"])
+            encoded = time.perf_counter()
+            payload, _ = transcribe_audio(chunk_settings, chunk_path, "file", cancel=cancel)
+            stats = {
+                "index": chunk["index"],
+                "start": round(chunk["start"] / rate, 3),
+                "end": round(chunk["end"] / rate, 3),
+                "upload_bytes": chunk_path.stat().st_size,
+                "encode_seconds": round(encoded - chunk_started, 3),
+                "request_seconds": round(time.perf_counter() - encoded, 3),
+            }
+            chunk_path.unlink(missing_ok=True)
+            return payload, stats
+
+        payloads = [None] * len(plan)
+        chunk_stats = [None] * len(plan)
+        pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {pool.submit(run, chunk): chunk["index"] for chunk in plan}
+            for done, future in enumerate(as_completed(futures), start=1):
+                index = futures[future]
+                try:
+                    payloads[index], chunk_stats[index] = future.result()
+                except JobCancelled:
+                    raise
+                except Exception as exc:
+                    raise RuntimeError(f"Chunk {index + 1}/{len(plan)} failed: {exc}") from exc
+                if progress is not None:
+                    stats = chunk_stats[index]
+                    progress(
+                        f"Chunk {done}/{len(plan)} done "
+                        f"(#{index + 1} in {stats['encode_seconds'] + stats['request_seconds']:.1f}s)"
+                    )
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    merged = stitch(plan, payloads, rate, total)
+    payload, response_text = render_verbose(merged, settings.response_format)
+    info = {
+        "codec": codec,
+        "chunk_workers": workers,
+        "upload_bytes": sum(stats["upload_bytes"] for stats in chunk_stats),
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        "chunks": chunk_stats,
+    }
+    return payload, response_text, info
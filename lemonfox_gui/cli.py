@@ -0,0 +1,29 @@
+import argparse
+import sys
+
+from .batch import collect_files, run_batch
+from .settings import load_settings, parse_int
+
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m lemonfox_gui batch",
+        description="Transcribe audio files without the GUI, using the saved settings.",
+    )
+    parser.add_argument("targets", nargs="+", help="folders, files or glob patterns")
+    parser.add_argument("-j", "--concurrency", type=int, help="parallel uploads (default: settings)")
+    parser.add_argument("--force", action="store_true", help="transcribe files that already have transcripts")
+    args = parser.parse_args(argv)
+
+    settings = load_settings()
+    if not settings.api_token:
+        print("Missing API token. Set it in the GUI settings first.", file=sys.stderr)
+        return 2
+    files = collect_files(args.targets)
+    if not files:
+        print("No audio files found.", file=sys.stderr)
+        return 1
+    concurrency = args.concurrency or parse_int(settings.batch_workers, 4)
+    stats = run_batch(settings, files, concurrency, skip_existing=not args.force, progress=print)
+    print(stats.summary())
+    return 1 if stats.failed else 0
@@ -0,0 +1,98 @@
+from math import gcd
+
+import numpy as np
+
+TAPS_PER_SIDE = 16
+KAISER_BETA = 8.0
+PCM16_SCALE = 32768.0
+
+
+def downmix(block):
+    if block.ndim == 1 or block.shape[1] == 1:
+        return block.reshape(len(block), 1)
+    return block.mean(axis=1, keepdims=True, dtype=np.float32)
+
+
+def to_pcm16(block):
+    return np.clip(np.rint(block * PCM16_SCALE), -32768, 32767).astype(np.int16)
+
+
+def to_float(block):
+    # Capture buffers may hold int16; analysis and resampling work on [-1, 1) floats.
+    if block.dtype == np.int16:
+        return block.astype(np.float32) / PCM16_SCALE
+    return block
+
+
+class Resampler:
+    # Streaming polyphase resampler with a Kaiser-windowed sinc low-pass. Blocks can
+    # have any length; flush() emits the tail so the output has round(n * up / down) frames.
+    def __init__(self, source_rate: int, target_rate: int, channels: int):
+        divisor = gcd(source_rate, target_rate)
+        self.up = target_rate // divisor
+        self.down = source_rate // divisor
+        self.channels = channels
+        factor = max(self.up, self.down)
+        self._delay = TAPS_PER_SIDE * factor
+        length = 2 * self._delay + 1
+        k = np.arange(length) - self._delay
+        taps = np.sinc(k / factor) * np.kaiser(length, KAISER_BETA) * self.up / factor
+        self._taps_per_phase = -(-length // self.up) + 1
+        padded = np.zeros(self._taps_per_phase * self.up)
+        padded[:length] = taps
+        self._phases = padded.reshape(self._taps_per_phase, self.up).T.astype(np.float32)
+        self._offsets = np.arange(self._taps_per_phase)
+        history = self._taps_per_phase - 1
+        self._history = np.zeros((history, channels), dtype=np.float32)
+        self._history_start = -history
+        self._consumed = 0
+        self._produced = 0
+        self._expected_in = 0
+
+    @property
+    def passthrough(self):
+        return self.up == self.down
+
+    def _run(self, block):
+        buf = np.concatenate([self._history, block.astype(np.float32, copy=False)], axis=0)
+        self._consumed += len(block)
+        end = (self._consumed * self.up - 1 - self._delay) // self.down + 1
+        if end <= self._produced:
+            out = np.empty((0, self.channels), dtype=np.float32)
+        else:
+            positions = np.arange(self._produced, end) * self.down + self._delay
+            newest = positions // self.up
+            phases = positions - newest * self.up
+            index = (newest - self._history_start)[:, None] - self._offsets[None, :]
+            out = np.einsum("ntc,nt->nc", buf[index], self._phases[phases])
+            self._produced = end
+        keep = self._taps_per_phase - 1
+        self._history = buf[len(buf) - keep:]
+        self._history_start = self._consumed - keep
+        return out
+
+    def process(self, block):
+        if self.passthrough:
+            return block
+        self._expected_in += len(block)
+        return self._run(block)
+
+    def flush(self):
+        if self.passthrough:
+            return np.empty((0, self.channels), dtype=np.float32)
+        expected = -(-self._expected_in * self.up // self.down)
+        pad = np.zeros((self._delay // self.up + 2, self.channels), dtype=np.float32)
+        out = self._run(pad)
+        extra = self._produced - expected
+        if extra > 0:
+            out = out[:len(out) - extra]
+            self._produced = expected
+        return out
+
+
+def frame_rms(block, frame_len: int):
+    usable = len(block) - len(block) % frame_len
+    if usable == 0:
+        return np.empty(0, dtype=np.float32)
+    frames = block[:usable].reshape(usable // frame_len, -1)
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
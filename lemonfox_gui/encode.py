@@ -0,0 +1,128 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import soundfile as sf
+
+from .dsp import Resampler, downmix
+from .settings import AppSettings
+
+UPLOAD_CODECS = {
+    "wav": ("WAV", "PCM_16", ".wav"),
+    "flac": ("FLAC", "PCM_16", ".flac"),
+    "opus": ("OGG", "OPUS", ".ogg"),
+}
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+LOSSLESS_CODECS = ("wav", "flac")
+# libsndfile subtypes of lossy audio (mp1/2/3, vorbis, opus).
+LOSSY_SUBTYPES = ("MPEG_LAYER_I", "MPEG_LAYER_II", "MPEG_LAYER_III", "VORBIS", "OPUS")
+SPEECH_RATE = 16000
+BLOCK_FRAMES = 65536
+
+
+def upload_target(settings: AppSettings, source_rate: int):
+    return SPEECH_RATE if settings.upload_resample else source_rate
+
+
+def encode_blocks(settings: AppSettings, blocks, source_rate: int, source_channels: int, target_path, codec):
+    file_format, subtype, _ = UPLOAD_CODECS[codec]
+    channels = 1 if settings.upload_mono else source_channels
+    rate = upload_target(settings, source_rate)
+    if codec == "opus" and rate not in OPUS_RATES:
+        rate = next((r for r in OPUS_RATES if r >= rate), OPUS_RATES[-1])
+    resampler = Resampler(source_rate, rate, channels)
+    with sf.SoundFile(
+        target_path, "w", samplerate=rate, channels=channels, format=file_format, subtype=subtype
+    ) as target:
+        for block in blocks:
+            if settings.upload_mono:
+                block = downmix(block)
+            target.write(resampler.process(block))
+        target.write(resampler.flush())
+    return rate, channels
+
+
+def already_compressed(settings: AppSettings, source):
+    # A lossless re-encode of lossy audio only gets bigger, and FLAC stays the same size
+    # unless it is also downmixed or resampled; those are uploaded without decoding.
+    if settings.upload_codec not in LOSSLESS_CODECS:
+        return False
+    if source.subtype in LOSSY_SUBTYPES:
+        return True
+    downmixed = settings.upload_mono and source.channels > 1
+    resampled = upload_target(settings, source.samplerate) < source.samplerate
+    return source.format == "FLAC" and not downmixed and not resampled
+
+
+def encode_range(settings: AppSettings, source, target_path, codec, start=0, stop=None):
+    source.seek(start)
+    frames = (source.frames if stop is None else stop) - start
+    blocks = source.blocks(BLOCK_FRAMES, frames=frames, dtype="float32", always_2d=True)
+    return encode_blocks(settings, blocks, source.samplerate, source.channels, target_path, codec)
+
+
+def encode_for_upload(settings: AppSettings, source_path):
+    # Returns (path to upload, info). The path is source_path itself (the same object)
+    # whenever the source is uploaded untouched, so callers can tell it is not a temp file.
+    path = Path(source_path)
+    codec = UPLOAD_CODECS.get(settings.upload_codec)
+    if codec is None:
+        return source_path, None
+    started = time.perf_counter()
+    try:
+        source = sf.SoundFile(path)
+    except sf.LibsndfileError:
+        # Containers libsndfile cannot decode (m4a, mp4, ...) are uploaded untouched.
+        return source_path, None
+    source_bytes = path.stat().st_size
+    with source:
+        duration = source.frames / source.samplerate
+        if already_compressed(settings, source):
+            return source_path, {
+                "codec": "original",
+                "sample_rate": source.samplerate,
+                "channels": source.channels,
+                "source_bytes": source_bytes,
+                "upload_bytes": source_bytes,
+                "bytes_saved": 0,
+                "encode_seconds": round(time.perf_counter() - started, 3),
+                "audio_seconds": round(duration, 3),
+            }
+        # Encode into the temp dir so read-only source folders (batch mode) still work.
+        fd, target_name = tempfile.mkstemp(prefix=f"{path.stem}.", suffix=f".upload{codec[2]}")
+        os.close(fd)
+        target_path = Path(target_name)
+        try:
+            rate, channels = encode_range(settings, source, target_path, settings.upload_codec)
+        except BaseException:
+            target_path.unlink(missing_ok=True)
+            raise
+    upload_bytes = target_path.stat().st_size
+    info = {
+        "codec": settings.upload_codec,
+        "sample_rate": rate,
+        "channels": channels,
+        "source_bytes": source_bytes,
+        "upload_bytes": upload_bytes,
+        "bytes_saved": source_bytes - upload_bytes,
+        "encode_seconds": round(time.perf_counter() - started, 3),
+        "audio_seconds": round(duration, 3),
+    }
+    if upload_bytes >= source_bytes:
+        target_path.unlink(missing_ok=True)
+        info["upload_bytes"] = source_bytes
+        info["bytes_saved"] = 0
+        return source_path, info
+    return target_path, info
+
+
+def describe_upload(info):
+    if not info:
+        return ""
+    saved = info["bytes_saved"]
+    percent = 100 * saved / info["source_bytes"] if info["source_bytes"] else 0
+    return (
+        f"{info['upload_bytes'] / 1e6:.1f} MB {info['codec']} "
+        f"(saved {saved / 1e6:.1f} MB / {percent:.0f}%, encoded in {info['encode_seconds']:.2f}s)"
+    )
@@ -0,0 +1,49 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .formats import markdown_lines, srt_lines, text_lines, vtt_lines, word_json_lines
+
+WRITE_BUFFER = 256 * 1024
+# name -> (file suffix, line generator over a verbose_json payload)
+EXPORTERS = {
+    "srt": (".srt", lambda payload: srt_lines(payload.get("segments") or [])),
+    "vtt": (".vtt", lambda payload: vtt_lines(payload.get("segments") or [])),
+    "txt": (".txt", lambda payload: text_lines(payload.get("segments") or [])),
+    "md": (".md", lambda payload: markdown_lines(payload.get("segments") or [])),
+    "words": (".words.json", word_json_lines),
+}
+
+
+def parse_export_formats(value: str):
+    wanted = {name.strip().lower() for name in (value or "").replace(";", ",").split(",")}
+    return [name for name in EXPORTERS if name in wanted]
+
+
+def write_export(payload, name: str, path):
+    # Lines go straight from the generator to a buffered file; the document is never
+    # held in memory as one string. The .part file keeps a half-written export from
+    # replacing a good one.
+    path = Path(path)
+    partial = path.with_name(path.name + ".part")
+    try:
+        with open(partial, "w", encoding="utf-8", newline="\n", buffering=WRITE_BUFFER) as handle:
+            handle.writelines(EXPORTERS[name][1](payload))
+        os.replace(partial, path)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def export_transcript(payload, base_path, formats=None, workers=None):
+    # Writes every format next to base_path (suffix appended) from one verbose_json
+    # payload, one thread per format. Returns {format: path}.
+    if not isinstance(payload, dict) or "segments" not in payload:
+        raise ValueError("Exports need a verbose_json transcript with segments")
+    base = Path(base_path)
+    formats = list(formats or EXPORTERS)
+    targets = {name: base.with_name(base.name + EXPORTERS[name][0]) for name in formats}
+    with ThreadPoolExecutor(max_workers=workers or len(targets)) as pool:
+        futures = {name: pool.submit(write_export, payload, name, path) for name, path in targets.items()}
+        return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,105 @@
+import json
+
+# json.dumps with non-default options builds a new encoder per call; reuse one.
+_WORD_ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+
+def format_timestamp(seconds, separator=","):
+    millis = int(round(float(seconds) * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def segment_text(seg):
+    text = (seg.get("text") or "").strip()
+    speaker = seg.get("speaker")
+    if speaker:
+        return f"{speaker}: {text}"
+    return text
+
+
+def srt_lines(segments):
+    for index, seg in enumerate(segments, start=1):
+        yield f"{index}\n"
+        yield f"{format_timestamp(seg.get('start', 0))} --> {format_timestamp(seg.get('end', 0))}\n"
+        yield f"{segment_text(seg)}\n\n"
+
+
+def vtt_lines(segments):
+    yield "WEBVTT\n\n"
+    for seg in segments:
+        start = format_timestamp(seg.get("start", 0), ".")
+        end = format_timestamp(seg.get("end", 0), ".")
+        yield f"{start} --> {end}\n"
+        yield f"{segment_text(seg)}\n\n"
+
+
+def text_lines(segments):
+    for seg in segments:
+        text = (seg.get("text") or "").strip()
+        if text:
+            yield f"{text}\n"
+
+
+def markdown_lines(segments):
+    # One paragraph per run of consecutive segments from the same speaker.
+    speaker = None
+    started = False
+    for seg in segments:
+        text = (seg.get("text") or "").strip()
+        if not text:
+            continue
+        if started and seg.get("speaker") == speaker:
+            yield f" {text}"
+            continue
+        if started:
+            yield "\n\n"
+        speaker = seg.get("speaker")
+        heading = f"**{speaker}** " if speaker else ""
+        yield f"{heading}[{format_timestamp(seg.get('start', 0))[:8]}]\n\n{text}"
+        started = True
+    if started:
+        yield "\n"
+
+
+def word_groups(payload):
+    # Word timestamps live on the segments; stitched payloads may only have a top-level list.
+    found = False
+    for seg in payload.get("segments") or []:
+        words = seg.get("words")
+        if not words:
+            continue
+        found = True
+        speaker = seg.get("speaker")
+        if speaker:
+            words = [word if "speaker" in word else dict(word, speaker=speaker) for word in words]
+        yield words
+    if not found and payload.get("words"):
+        yield payload["words"]
+
+
+def word_json_lines(payload):
+    # A flat JSON array of words, one segment's words per line. Encoding a segment
+    # at a time is several times faster than one encoder call per word.
+    yield "["
+    separator = "\n  "
+    for words in word_groups(payload):
+        yield separator + _WORD_ENCODER.encode(words)[1:-1]
+        separator = ",\n  "
+    yield "\n]\n"
+
+
+def render_verbose(payload, response_format):
+    # Converts a verbose_json payload into the shape the API returns for response_format.
+    segments = payload.get("segments", [])
+    if response_format == "verbose_json":
+        return payload, None
+    if response_format == "json":
+        return {"text": payload.get("text", "")}, None
+    if response_format == "srt":
+        return None, "".join(srt_lines(segments))
+    if response_format == "vtt":
+        return None, "".join(vtt_lines(segments))
+    return None, payload.get("text", "")
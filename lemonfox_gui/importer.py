@@ -0,0 +1,79 @@
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from .jobs import JobCancelled
+
+IMPORT_MODES = ("link", "copy", "reference")
+COPY_BLOCK = 8 * 1024 * 1024
+FICLONE = 0x40049409
+
+
+def _reflink(source, target):
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+
+    with open(source, "rb") as src, open(target, "xb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return True
+        except OSError:
+            pass
+    target.unlink(missing_ok=True)
+    return False
+
+
+def _hardlink(source, target):
+    try:
+        os.link(source, target)
+        return True
+    except OSError:
+        return False
+
+
+def _copy(source, target, progress=None, cancel=None):
+    total = source.stat().st_size
+    done = 0
+    with open(source, "rb") as src, open(target, "xb") as dst:
+        use_sendfile = hasattr(os, "sendfile") and sys.platform.startswith("linux")
+        buffer = None if use_sendfile else bytearray(COPY_BLOCK)
+        while done < total:
+            if cancel is not None and cancel.is_set():
+                dst.close()
+                target.unlink(missing_ok=True)
+                raise JobCancelled("Cancelled")
+            if use_sendfile:
+                sent = os.sendfile(dst.fileno(), src.fileno(), done, COPY_BLOCK)
+            else:
+                sent = src.readinto(buffer)
+                dst.write(memoryview(buffer)[:sent])
+            if not sent:
+                break
+            done += sent
+            if progress is not None:
+                progress(done, total)
+
+
+def import_audio(source, audio_dir, mode="link", progress=None, cancel=None):
+    source = Path(source)
+    if mode == "reference":
+        return source, "reference"
+    audio_dir = Path(audio_dir)
+    audio_dir.mkdir(parents=True, exist_ok=True)
+    if source.resolve().parent == audio_dir.resolve():
+        return source, "in place"
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    target = audio_dir / f"{source.stem}_{timestamp}{source.suffix}"
+    counter = 2
+    while target.exists():
+        target = audio_dir / f"{source.stem}_{timestamp}_{counter}{source.suffix}"
+        counter += 1
+    if mode == "link":
+        if _reflink(source, target):
+            return target, "reflink"
+        if _hardlink(source, target):
+            return target, "hardlink"
+    _copy(source, target, progress, cancel)
+    return target, "copy"
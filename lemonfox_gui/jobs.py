@@ -0,0 +1,204 @@
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+
+PRIORITY_LIVE = 0
+PRIORITY_FILE = 1
+PRIORITY_BULK = 2
+FINISHED_HISTORY = 50
+
+
+class JobCancelled(Exception):
+    pass
+
+
+@dataclass
+class Job:
+    id: int
+    source: object
+    source_type: str
+    priority: int
+    label: str
+    force: bool = False
+    state: str = "queued"
+    error: str = ""
+    created: float = field(default_factory=time.monotonic)
+    started: float = None
+    finished: float = None
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    detached: bool = False
+    outcome: tuple = None
+    # Settings snapshot taken when the job was queued; None means the caller's current ones.
+    settings: object = None
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise JobCancelled(f"Job {self.id} cancelled")
+
+    def detach(self):
+        # The worker hands the job off (e.g. to a webhook); it stays "waiting" without
+        # holding a worker slot until JobScheduler.complete() is called.
+        self.detached = True
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+
+class JobScheduler:
+    def __init__(self, worker, max_workers: int = 2, on_change=None):
+        self._worker = worker
+        self._on_change = on_change
+        self._max_workers = max(1, max_workers)
+        self._cond = threading.Condition()
+        self._queue = []
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._order = itertools.count()
+        self._threads = []
+        self._running = 0
+        self._closed = False
+
+    @property
+    def max_workers(self):
+        return self._max_workers
+
+    def set_max_workers(self, count: int):
+        with self._cond:
+            self._max_workers = max(1, count)
+            # A raised limit needs its threads now, or queued jobs wait for the next submit.
+            self._spawn_workers()
+            self._cond.notify_all()
+
+    def _spawn_workers(self):
+        # Called with the lock held. Threads are never stopped: a lowered limit only
+        # keeps the extra ones idle in _next_job.
+        if self._closed:
+            return
+        while len(self._threads) < self._max_workers:
+            thread = threading.Thread(target=self._loop, daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def submit(
+        self, source, source_type: str, priority: int = PRIORITY_FILE, label: str = "", force=False, settings=None
+    ):
+        with self._cond:
+            job = Job(next(self._ids), source, source_type, priority, label or str(source), force, settings=settings)
+            self._jobs[job.id] = job
+            heapq.heappush(self._queue, (priority, next(self._order), job))
+            self._spawn_workers()
+            self._cond.notify_all()
+        self._changed(job)
+        return job
+
+    def cancel(self, job_id: int):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.state not in ("queued", "running", "waiting"):
+                return False
+            job.cancel_event.set()
+            if job.state in ("queued", "waiting"):
+                job.state = "cancelled"
+                job.finished = time.monotonic()
+        self._changed(job)
+        return True
+
+    def jobs(self):
+        with self._cond:
+            return list(self._jobs.values())
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            for job in self._jobs.values():
+                job.cancel_event.set()
+            self._cond.notify_all()
+
+    def _changed(self, job):
+        if self._on_change is not None:
+            self._on_change(job)
+
+    def _next_job(self):
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+                if self._queue and self._running < self._max_workers:
+                    _, _, job = heapq.heappop(self._queue)
+                    if job.state == "cancelled":
+                        continue
+                    job.state = "running"
+                    job.started = time.monotonic()
+                    self._running += 1
+                    return job
+                self._cond.wait()
+
+    def complete(self, job_id: int, state: str, error=""):
+        # Finishes a detached job. A result can arrive before the worker has returned;
+        # it is kept on the job and applied when the worker releases its slot.
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            if job.state == "running" and job.detached:
+                job.outcome = (state, error)
+                return True
+            if job.state != "waiting":
+                return False
+            self._settle(job, state, error)
+        self._changed(job)
+        return True
+
+    def _settle(self, job, state, error):
+        job.state = state
+        job.error = error
+        job.finished = time.monotonic()
+        finished = [j for j in self._jobs.values() if j.finished is not None]
+        for old in sorted(finished, key=lambda j: j.finished)[:-FINISHED_HISTORY]:
+            del self._jobs[old.id]
+        self._cond.notify_all()
+
+    def _finish(self, job, state, error=""):
+        with self._cond:
+            self._running -= 1
+            self._settle(job, state, error)
+        self._changed(job)
+
+    def _release(self, job):
+        with self._cond:
+            self._running -= 1
+            if job.outcome is not None:
+                self._settle(job, *job.outcome)
+            else:
+                job.state = "waiting"
+                self._cond.notify_all()
+        self._changed(job)
+
+    def _loop(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            self._changed(job)
+            try:
+                self._worker(job)
+            except JobCancelled:
+                self._finish(job, "cancelled")
+            except Exception as exc:
+                self._finish(job, "failed", str(exc))
+            else:
+                if job.cancelled:
+                    self._finish(job, "cancelled")
+                elif job.detached:
+                    self._release(job)
+                else:
+                    self._finish(job, "done")
@@ -0,0 +1,249 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, fields
+from pathlib import Path
+
+from .settings import APP_DIR, AppSettings
+
+JOURNAL_PATH = APP_DIR / "jobs.sqlite3"
+# Transitions are group-committed: one transaction per interval instead of per write.
+FLUSH_INTERVAL = 0.2
+ACTIVE_STATES = ("queued", "running", "waiting")
+KEEP_DAYS = 30
+# Never written to disk outside settings.json.
+SECRET_FIELDS = ("api_token",)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    source_type TEXT NOT NULL,
+    source TEXT NOT NULL,
+    label TEXT,
+    priority INTEGER,
+    force INTEGER,
+    settings TEXT,
+    state TEXT NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs(state);
+CREATE TABLE IF NOT EXISTS events (
+    key TEXT NOT NULL,
+    at REAL NOT NULL,
+    state TEXT NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS events_key ON events(key);
+"""
+
+
+def journal_source(source, source_type: str):
+    # Returns (source_type, JSON-able source) for a job that can be run again after a
+    # restart. Live sessions are replayed from their recording file.
+    if source_type == "live":
+        return "file", str(source.recording_path)
+    if source_type == "tracks":
+        return "tracks", [[name, str(path)] for name, path in source]
+    return source_type, str(source)
+
+
+def restore_source(source, source_type: str):
+    if source_type == "tracks":
+        return [(name, Path(path)) for name, path in source]
+    if source_type == "url":
+        return source
+    return Path(source)
+
+
+def transcript_source(source, source_type: str):
+    # The source a finished job's transcript is saved under (see save_transcript). Import
+    # jobs are switched to their imported copy once it exists (see set_source).
+    return str(source[0][1] if source_type == "tracks" else source)
+
+
+def snapshot_settings(settings: AppSettings):
+    data = asdict(settings)
+    for name in SECRET_FIELDS:
+        data.pop(name, None)
+    return data
+
+
+def restore_settings(snapshot, current: AppSettings):
+    # Unknown fields from older versions are dropped; secrets come from the current settings.
+    known = {field.name for field in fields(AppSettings)} - set(SECRET_FIELDS)
+    values = asdict(current)
+    values.update({name: value for name, value in (snapshot or {}).items() if name in known})
+    return AppSettings(**values)
+
+
+class JobJournal:
+    # Durable record of every job: source, settings snapshot and state transitions.
+    # Calls only enqueue; a writer thread commits them in batches. WAL with
+    # synchronous=NORMAL survives an app crash; a power cut can lose the last batches.
+    def __init__(self, path=JOURNAL_PATH, flush_interval: float = FLUSH_INTERVAL):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.error = None
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._prune()
+        self._keys = {}
+        self._lock = threading.Lock()
+        self._conn_lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _prune(self):
+        cutoff = time.time() - KEEP_DAYS * 86400
+        placeholders = ",".join("?" * len(ACTIVE_STATES))
+        with self._conn:
+            self._conn.execute(
+                f"DELETE FROM events WHERE key IN (SELECT key FROM jobs WHERE updated_at < ? "
+                f"AND state NOT IN ({placeholders}))",
+                (cutoff, *ACTIVE_STATES),
+            )
+            self._conn.execute(
+                f"DELETE FROM jobs WHERE updated_at < ? AND state NOT IN ({placeholders})", (cutoff, *ACTIVE_STATES)
+            )
+
+    def add(self, job, settings: AppSettings):
+        source_type, source = journal_source(job.source, job.source_type)
+        key = uuid.uuid4().hex
+        now = time.time()
+        # Under the lock so a transition of an already running job cannot be queued
+        # ahead of the INSERT; job.state, not "queued", as the job may have moved on.
+        with self._lock:
+            self._keys[job.id] = key
+            self._queue.put((
+                "INSERT INTO jobs (key, created_at, updated_at, source_type, source, label, priority, force, "
+                "settings, state, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key, now, now, source_type, json.dumps(source), job.label, job.priority, int(job.force),
+                    json.dumps(snapshot_settings(settings)), job.state, job.error,
+                ),
+            ))
+            self._event(key, job.state, job.error, now)
+        return key
+
+    def attach(self, key: str, job):
+        # A job re-queued after a restart continues its old entry.
+        with self._lock:
+            self._keys[job.id] = key
+        self.update(job)
+
+    def update(self, job):
+        with self._lock:
+            key = self._keys.get(job.id)
+            if key is None:
+                return
+            if job.state not in ACTIVE_STATES:
+                del self._keys[job.id]
+            self.set_state(key, job.state, job.error)
+
+    def set_source(self, job, source, source_type: str):
+        # After an import the job continues from the copy, which is also the source its
+        # transcript is saved under; a resumed job then neither imports nor uploads again.
+        source_type, source = journal_source(source, source_type)
+        with self._lock:
+            key = self._keys.get(job.id)
+            if key is None:
+                return
+            self._queue.put((
+                "UPDATE jobs SET source_type = ?, source = ?, updated_at = ? WHERE key = ?",
+                (source_type, json.dumps(source), time.time(), key),
+            ))
+
+    def set_state(self, key: str, state: str, error: str = ""):
+        # Also closes an entry without running it (e.g. its transcript already exists).
+        now = time.time()
+        self._queue.put(("UPDATE jobs SET state = ?, error = ?, updated_at = ? WHERE key = ?", (state, error, now, key)))
+        self._event(key, state, error, now)
+
+    def _event(self, key, state, error, now):
+        self._queue.put(("INSERT INTO events (key, at, state, error) VALUES (?, ?, ?, ?)", (key, now, state, error)))
+
+    def unfinished(self):
+        placeholders = ",".join("?" * len(ACTIVE_STATES))
+        with self._conn_lock:
+            rows = self._conn.execute(
+                f"SELECT key, source_type, source, label, priority, force, settings FROM jobs "
+                f"WHERE state IN ({placeholders}) ORDER BY created_at",
+                ACTIVE_STATES,
+            ).fetchall()
+        return [
+            {
+                "key": key,
+                "source_type": source_type,
+                "source": restore_source(json.loads(source), source_type),
+                "label": label,
+                "priority": priority,
+                "force": bool(force),
+                "settings": json.loads(settings) if settings else {},
+            }
+            for key, source_type, source, label, priority, force, settings in rows
+        ]
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            # Collect until the interval ends, a flush() asks for the batch or close() stops.
+            while batch[-1] is not None and not isinstance(batch[-1], threading.Event):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            stop = batch[-1] is None
+            self._write([item for item in batch if item is not None])
+
+    def _write(self, batch):
+        try:
+            with self._conn_lock, self._conn:
+                for item in batch:
+                    if not isinstance(item, threading.Event):
+                        self._conn.execute(*item)
+        except sqlite3.Error as exc:
+            # The journal is a safety net; a failed write must never fail a job.
+            self.error = exc
+        for item in batch:
+            if isinstance(item, threading.Event):
+                item.set()
+
+    def flush(self, timeout: float = 5.0):
+        # Commits everything queued so far without waiting for the batch interval.
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        self.flush()
+        self._queue.put(None)
+        self._thread.join(timeout=5.0)
+        with self._conn_lock:
+            self._conn.close()
+
+
+_journals = {}
+_journals_lock = threading.Lock()
+
+
+def open_journal(path=JOURNAL_PATH):
+    with _journals_lock:
+        journal = _journals.get(str(path))
+        if journal is None:
+            journal = JobJournal(path)
+            _journals[str(path)] = journal
+        return journal
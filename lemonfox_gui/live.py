@@ -0,0 +1,156 @@
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+from .api_client import transcribe_audio
+from .chunking import stitch
+from .dsp import to_float
+from .encode import UPLOAD_CODECS, encode_blocks
+from .formats import render_verbose
+from .settings import AppSettings, parse_int
+from .vad import UtteranceDetector
+
+POLL_INTERVAL = 0.1
+LIVE_WORKERS = 2
+
+
+class LiveSession:
+    def __init__(self, settings: AppSettings, buffer, sample_rate: int, on_text=None):
+        self.settings = settings
+        self.sample_rate = sample_rate
+        self.on_text = on_text
+        self.started = time.monotonic()
+        self.first_text_seconds = None
+        self.upload_bytes = 0
+        self._buffer = buffer
+        self._codec = settings.upload_codec if settings.upload_codec in UPLOAD_CODECS else "flac"
+        self._request_settings = replace(settings, response_format="verbose_json", upload_codec=self._codec)
+        pause = parse_int(settings.live_pause_ms, 600) / 1000
+        self._detector = UtteranceDetector(sample_rate, pause_seconds=pause)
+        self._pool = ThreadPoolExecutor(max_workers=LIVE_WORKERS)
+        self._lock = threading.Lock()
+        self._utterances = []
+        self._futures = []
+        self._results = {}
+        # index -> audio blocks of utterances whose upload failed; their result is
+        # None so live emission goes on past them.
+        self._failed = {}
+        self._emitted = 0
+        self.merged = None
+        self.recording_path = None
+        self._position = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(POLL_INTERVAL):
+            self._drain()
+
+    def _drain(self):
+        frames = self._buffer.frames
+        for block in self._buffer.read(self._position, frames):
+            for start, end in self._detector.feed(to_float(block)):
+                self._submit(start, min(end, frames))
+        self._position = frames
+
+    def _submit(self, start, end):
+        index = len(self._utterances)
+        self._utterances.append((start, end))
+        # Copy the utterance out of the capture buffer now: the buffer is released
+        # once the recording is stopped, possibly while the upload is still running.
+        blocks = [block.copy() for block in self._buffer.read(start, end)]
+        self._futures.append(self._pool.submit(self._transcribe, index, blocks))
+
+    def _request(self, index, blocks):
+        suffix = UPLOAD_CODECS[self._codec][2]
+        fd, name = tempfile.mkstemp(prefix=f"live_{index:04d}_", suffix=suffix)
+        os.close(fd)
+        try:
+            encode_blocks(
+                self._request_settings, map(to_float, blocks), self.sample_rate, self._buffer.channels, name, self._codec
+            )
+            size = os.path.getsize(name)
+            payload, _ = transcribe_audio(self._request_settings, name, "file")
+        finally:
+            os.unlink(name)
+        with self._lock:
+            self.upload_bytes += size
+        return payload
+
+    def _transcribe(self, index, blocks):
+        try:
+            payload = self._request(index, blocks)
+        except Exception:
+            payload = None
+            with self._lock:
+                self._failed[index] = blocks
+        with self._lock:
+            self._results[index] = payload
+            # Results can arrive out of order; only emit the contiguous prefix.
+            while self._emitted in self._results:
+                text = ((self._results[self._emitted] or {}).get("text") or "").strip()
+                self._emitted += 1
+                if text:
+                    if self.first_text_seconds is None:
+                        self.first_text_seconds = time.monotonic() - self.started
+                    if self.on_text is not None:
+                        self.on_text(text)
+
+    def pause(self):
+        self._stop.set()
+        self._thread.join()
+
+    def stop(self):
+        self.pause()
+        self._drain()
+        frames = self._buffer.frames
+        for start, end in self._detector.finish(frames):
+            self._submit(start, end)
+
+    def finish(self):
+        for future in self._futures:
+            future.result()
+        self._pool.shutdown()
+        # Failed utterances get one more attempt now that the recording is complete.
+        errors = []
+        for index, blocks in sorted(self._failed.items()):
+            try:
+                self._results[index] = self._request(index, blocks)
+            except Exception as exc:
+                errors.append(str(exc))
+        plan = []
+        for index, (start, end) in enumerate(self._utterances):
+            next_start = self._utterances[index + 1][0] if index + 1 < len(self._utterances) else end
+            plan.append({"index": index, "start": start, "end": end, "cut_start": start, "cut_end": next_start})
+        info = {
+            "live": True,
+            "utterances": len(plan),
+            "retried_utterances": len(self._failed),
+            "time_to_first_text": round(self.first_text_seconds, 3) if self.first_text_seconds else None,
+        }
+        if errors:
+            if self.recording_path is None:
+                raise RuntimeError(f"{len(errors)} live segments failed: {errors[0]}")
+            # Still failing: transcribe the saved recording as a whole instead.
+            merged, upload_info = self._transcribe_recording()
+            info["fallback"] = "recording"
+            self.upload_bytes += (upload_info or {}).get("upload_bytes") or 0
+        else:
+            payloads = [self._results[index] for index in range(len(plan))]
+            merged = stitch(plan, payloads, self.sample_rate, self._buffer.frames)
+        self.merged = merged
+        info["upload_bytes"] = self.upload_bytes
+        payload, response_text = render_verbose(merged, self.settings.response_format)
+        return payload, response_text, info
+
+    def _transcribe_recording(self):
+        from .pipeline import run_transcription
+
+        result = run_transcription(
+            replace(self.settings, response_format="verbose_json"), self.recording_path, "file", save=False
+        )
+        return result["payload"], result["upload_info"]
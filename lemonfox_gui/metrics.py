@@ -0,0 +1,159 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from .settings import APP_DIR
+
+METRICS_PATH = APP_DIR / "metrics.jsonl"
+METRICS_MAX_BYTES = 5 * 1024 * 1024
+METRICS_BACKUPS = 3
+PROFILE_DIR = APP_DIR / "profiles"
+PROFILE_MODES = ("off", "cprofile", "tracemalloc")
+
+_log_lock = threading.Lock()
+_tracemalloc_lock = threading.Lock()
+_cprofile_lock = threading.Lock()
+_cprofile_active = False
+
+
+class JobMetrics:
+    # One timed span per pipeline stage of a job, with the bytes and audio seconds it
+    # handled where they are known.
+    def __init__(self, label: str = "", source_type: str = ""):
+        self.label = label
+        self.source_type = source_type
+        self.started = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float, size=None, audio_seconds=None):
+        span = {"stage": stage, "seconds": round(seconds, 4)}
+        if size is not None:
+            span["bytes"] = int(size)
+        if audio_seconds is not None:
+            span["audio_seconds"] = round(audio_seconds, 3)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    @contextmanager
+    def span(self, stage: str, size=None, audio_seconds=None):
+        # The yielded dict can be filled in while the stage runs (e.g. bytes once known).
+        extra = {"bytes": size, "audio_seconds": audio_seconds}
+        started = time.perf_counter()
+        try:
+            yield extra
+        finally:
+            self.add(stage, time.perf_counter() - started, extra["bytes"], extra["audio_seconds"])
+
+    @property
+    def total_seconds(self):
+        return time.perf_counter() - self.started
+
+    def breakdown(self):
+        # Repeated stages (retries, several chunks) are summed, in first-seen order.
+        totals = {}
+        with self._lock:
+            for span in self.spans:
+                totals[span["stage"]] = totals.get(span["stage"], 0.0) + span["seconds"]
+        return totals
+
+    def summary(self):
+        parts = [f"{stage} {seconds:.2f}s" for stage, seconds in self.breakdown().items()]
+        return f"{self.total_seconds:.2f}s total: " + ", ".join(parts) if parts else ""
+
+    def record(self, outcome: str, **extra):
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "label": self.label,
+            "source_type": self.source_type,
+            "outcome": outcome,
+            "total_seconds": round(self.total_seconds, 4),
+            "spans": spans,
+            **extra,
+        }
+
+
+def _rotate(path):
+    for index in range(METRICS_BACKUPS - 1, 0, -1):
+        older = path.with_name(f"{path.name}.{index}")
+        if older.exists():
+            os.replace(older, path.with_name(f"{path.name}.{index + 1}"))
+    os.replace(path, path.with_name(f"{path.name}.1"))
+
+
+def log_metrics(record, path=METRICS_PATH):
+    # Telemetry must never fail a job: write errors are dropped.
+    line = json.dumps(record, ensure_ascii=True) + "\n"
+    with _log_lock:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.exists() and path.stat().st_size + len(line) > METRICS_MAX_BYTES:
+                _rotate(path)
+            with open(path, "a", encoding="utf-8") as handle:
+                handle.write(line)
+        except OSError:
+            pass
+
+
+@contextmanager
+def profiled(mode: str, name: str, directory=PROFILE_DIR):
+    # Optional deep profiling of one job: a .prof file for cProfile (open with pstats or
+    # snakeviz) or a text report of the top allocations for tracemalloc. Yields whether
+    # this job writes a report; with parallel jobs only one is profiled at a time.
+    global _cprofile_active
+    if mode not in ("cprofile", "tracemalloc"):
+        yield False
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if mode == "cprofile":
+        import cProfile
+
+        # Only one cProfile profiler can be active per process (Python 3.12+), and it
+        # only sees the worker thread that enabled it; other jobs run unprofiled.
+        with _cprofile_lock:
+            owner = not _cprofile_active
+            if owner:
+                profiler = cProfile.Profile()
+                try:
+                    profiler.enable()
+                except ValueError:
+                    # Another profiling tool (e.g. a debugger) is already active.
+                    owner = False
+                _cprofile_active = owner
+        if not owner:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            profiler.disable()
+            with _cprofile_lock:
+                _cprofile_active = False
+            profiler.dump_stats(str(directory / f"{name}_{stamp}.prof"))
+        return
+
+    import tracemalloc
+
+    # tracemalloc is process wide; concurrent jobs share one trace and only the job
+    # that started it writes the report.
+    with _tracemalloc_lock:
+        owner = not tracemalloc.is_tracing()
+        if owner:
+            tracemalloc.start(25)
+    try:
+        yield owner
+    finally:
+        if owner:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            lines = [f"current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB", ""]
+            lines += [str(stat) for stat in snapshot.statistics("lineno")[:25]]
+            (directory / f"{name}_{stamp}.tracemalloc.txt").write_text("\n".join(lines), encoding="utf-8")
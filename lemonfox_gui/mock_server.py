@@ -0,0 +1,320 @@
+import argparse
+import io
+import json
+import random
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+from urllib.request import Request, urlopen
+
+import soundfile as sf
+
+from .formats import render_verbose
+
+SEGMENT_SECONDS = 5.0
+IO_BLOCK = 64 * 1024
+WORDS = ("lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit")
+
+
+def parse_form(content_type: str, body: bytes):
+    # Returns (fields, file_bytes); file_bytes is None for URL submissions.
+    if content_type.startswith("application/x-www-form-urlencoded"):
+        pairs = parse_qsl(body.decode("utf-8"), keep_blank_values=True)
+        return _collect(pairs), None
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body
+    )
+    pairs = []
+    file_bytes = None
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if part.get_filename() is not None:
+            file_bytes = part.get_payload(decode=True)
+        else:
+            pairs.append((name, part.get_payload(decode=True).decode("utf-8")))
+    return _collect(pairs), file_bytes
+
+
+def _collect(pairs):
+    fields = {}
+    for name, value in pairs:
+        fields.setdefault(name, []).append(value)
+    return {name: values if name.endswith("[]") else values[-1] for name, values in fields.items()}
+
+
+def audio_duration(file_bytes):
+    if not file_bytes:
+        return 30.0
+    try:
+        info = sf.info(io.BytesIO(file_bytes))
+        return info.frames / info.samplerate
+    except (sf.LibsndfileError, RuntimeError):
+        # Undecodable input: pretend 16 kHz PCM16 mono.
+        return len(file_bytes) / 32000
+
+
+def mock_payload(fields, duration: float):
+    words_wanted = "word" in fields.get("timestamp_granularities[]", [])
+    speakers = fields.get("speaker_labels") == "true"
+    segments = []
+    start = 0.0
+    index = 0
+    while start < duration:
+        end = min(duration, start + SEGMENT_SECONDS)
+        text = " ".join(WORDS[(index + n) % len(WORDS)] for n in range(6))
+        seg = {"id": index, "start": round(start, 3), "end": round(end, 3), "text": text}
+        if speakers:
+            seg["speaker"] = f"SPEAKER_{index % 2:02d}"
+        if words_wanted:
+            step = (end - start) / 6
+            seg["words"] = [
+                {"word": word, "start": round(start + n * step, 3), "end": round(start + (n + 1) * step, 3)}
+                for n, word in enumerate(text.split())
+            ]
+        segments.append(seg)
+        start = end
+        index += 1
+    return {
+        "task": "translate" if fields.get("translate") == "true" else "transcribe",
+        "language": fields.get("language") or "english",
+        "duration": round(duration, 3),
+        "text": " ".join(seg["text"] for seg in segments),
+        "segments": segments,
+    }
+
+
+def render_response(fields, payload):
+    # Returns (body bytes, content type) in the requested response_format.
+    response_format = fields.get("response_format") or "json"
+    data, text = render_verbose(payload, response_format)
+    if data is not None:
+        return json.dumps(data).encode("utf-8"), "application/json"
+    return text.encode("utf-8"), "text/plain; charset=utf-8"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server.mock
+        if self.path.split("?", 1)[0] != "/v1/audio/transcriptions":
+            self._reply(404, b'{"error": "not found"}', "application/json")
+            return
+        if server.token and self.headers.get("Authorization") != f"Bearer {server.token}":
+            self._reply(401, b'{"error": "invalid token"}', "application/json")
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self._read_body(length, server.bandwidth)
+        fields, file_bytes = parse_form(self.headers.get("Content-Type", ""), body)
+        server._record(fields, file_bytes, self.headers)
+
+        fault = server._pick_fault()
+        if fault == "timeout":
+            # Hold the connection without answering, like a stalled upstream.
+            time.sleep(server.hang_seconds)
+            self.close_connection = True
+            return
+        if fault is not None:
+            headers = {"Retry-After": str(server.retry_after)} if fault in server.retry_after_statuses else {}
+            error = json.dumps({"error": {"message": f"injected {fault}"}}).encode("utf-8")
+            self._reply(fault, error, "application/json", headers)
+            return
+
+        duration = audio_duration(file_bytes)
+        time.sleep(server._processing_seconds(duration))
+        payload = mock_payload(fields, duration)
+        body, content_type = render_response(fields, payload)
+        callback_url = fields.get("callback_url")
+        if callback_url:
+            server._schedule_callback(callback_url, body, content_type)
+            ack = json.dumps({"id": uuid.uuid4().hex, "status": "processing"}).encode("utf-8")
+            self._reply(200, ack, "application/json")
+            return
+        self._reply(200, body, content_type, bandwidth=server.bandwidth)
+
+    def _read_body(self, length, bandwidth):
+        if not bandwidth:
+            return self.rfile.read(length)
+        # Reading slowly lets TCP back-pressure throttle the client's upload.
+        body = bytearray()
+        started = time.monotonic()
+        while len(body) < length:
+            block = self.rfile.read(min(IO_BLOCK, length - len(body)))
+            if not block:
+                break
+            body += block
+            _pace(started, len(body), bandwidth)
+        return bytes(body)
+
+    def _reply(self, status, body, content_type, headers=None, bandwidth=0):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if not bandwidth:
+            self.wfile.write(body)
+            return
+        started = time.monotonic()
+        for offset in range(0, len(body), IO_BLOCK):
+            self.wfile.write(body[offset:offset + IO_BLOCK])
+            _pace(started, offset + IO_BLOCK, bandwidth)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _pace(started, sent, bandwidth):
+    ahead = sent / bandwidth - (time.monotonic() - started)
+    if ahead > 0:
+        time.sleep(ahead)
+
+
+class MockLemonfoxServer:
+    # Local stand-in for the Lemonfox transcription endpoint. Accepts the same form
+    # fields, answers in every response_format and posts delayed callbacks. Latency,
+    # bandwidth and injected failures are configurable for benchmarks and retry tests.
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        callback_delay: float = 1.0,
+        token: str = "",
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        realtime_factor: float = 0.0,
+        bandwidth: float = 0.0,
+        error_rate: float = 0.0,
+        error_statuses=(429, 500, 503),
+        timeout_rate: float = 0.0,
+        hang_seconds: float = 30.0,
+        retry_after: float = 1.0,
+        retry_after_statuses=(429,),
+        seed=None,
+    ):
+        self.callback_delay = callback_delay
+        self.token = token
+        self.latency = latency
+        self.jitter = jitter
+        self.realtime_factor = realtime_factor
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.retry_after = retry_after
+        # Injected errors that carry Retry-After. The client only retries a 503 that
+        # has one, so this decides whether injected 503s are transient or final.
+        self.retry_after_statuses = tuple(retry_after_statuses)
+        self.requests = []
+        self.callbacks_sent = 0
+        self.faults = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _record(self, fields, file_bytes, headers):
+        with self._lock:
+            self.requests.append({
+                "fields": fields,
+                "file_bytes": len(file_bytes) if file_bytes is not None else None,
+                "idempotency_key": headers.get("Idempotency-Key"),
+                "time": time.monotonic(),
+            })
+
+    def _pick_fault(self):
+        with self._lock:
+            roll = self._random.random()
+            if roll < self.timeout_rate:
+                fault = "timeout"
+            elif roll < self.timeout_rate + self.error_rate:
+                fault = self._random.choice(self.error_statuses)
+            else:
+                return None
+            self.faults[fault] = self.faults.get(fault, 0) + 1
+            return fault
+
+    def _processing_seconds(self, duration):
+        with self._lock:
+            spread = self._random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        return max(0.0, self.latency + spread + duration * self.realtime_factor)
+
+    def _schedule_callback(self, url, body, content_type):
+        def send():
+            request = Request(url, data=body, headers={"Content-Type": content_type}, method="POST")
+            try:
+                urlopen(request, timeout=30).close()
+            except OSError:
+                return
+            with self._lock:
+                self.callbacks_sent += 1
+
+        timer = threading.Timer(self.callback_delay, send)
+        timer.daemon = True
+        timer.start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local mock of the Lemonfox transcription API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--callback-delay", type=float, default=1.0)
+    parser.add_argument("--token", default="", help="require this bearer token")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of random latency")
+    parser.add_argument("--realtime-factor", type=float, default=0.0, help="server seconds per audio second")
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="bytes per second each way, 0 = unlimited")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with an error")
+    parser.add_argument("--error-statuses", type=int, nargs="*", default=[429, 500, 503])
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="fraction of requests that never answer")
+    parser.add_argument("--hang-seconds", type=float, default=30.0)
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on injected errors")
+    parser.add_argument(
+        "--retry-after-statuses", type=int, nargs="*", default=[429], help="injected statuses sent with Retry-After"
+    )
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+    server = MockLemonfoxServer(
+        args.host,
+        args.port,
+        callback_delay=args.callback_delay,
+        token=args.token,
+        latency=args.latency,
+        jitter=args.jitter,
+        realtime_factor=args.realtime_factor,
+        bandwidth=args.bandwidth,
+        error_rate=args.error_rate,
+        error_statuses=args.error_statuses,
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds,
+        retry_after=args.retry_after,
+        retry_after_statuses=args.retry_after_statuses,
+        seed=args.seed,
+    )
+    print(f"Mock Lemonfox API on {server.url} (set it as API base in Settings)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
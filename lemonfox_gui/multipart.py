@@ -0,0 +1,79 @@
+import mimetypes
+import os
+import uuid
+from pathlib import Path
+
+from .jobs import JobCancelled
+
+
+class MultipartUpload:
+    # File-like multipart/form-data body: requests reads it block by block, so memory
+    # stays flat for any file size and every read reports progress and checks cancel.
+    def __init__(self, fields, file_field: str, file_path, progress=None, cancel=None):
+        self.boundary = uuid.uuid4().hex
+        self.file_path = Path(file_path)
+        self.progress = progress
+        self.cancel = cancel
+        self.bytes_sent = 0
+
+        head = bytearray()
+        for name, value in fields:
+            head += f"--{self.boundary}\r\n".encode("ascii")
+            head += f'Content-Disposition: form-data; name="{name}"\r\n\r\n'.encode("utf-8")
+            head += f"{value}\r\n".encode("utf-8")
+        content_type = mimetypes.guess_type(self.file_path.name)[0] or "application/octet-stream"
+        head += f"--{self.boundary}\r\n".encode("ascii")
+        head += (
+            f'Content-Disposition: form-data; name="{file_field}"; filename="{self.file_path.name}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+        tail = f"\r\n--{self.boundary}--\r\n".encode("ascii")
+
+        self._head = bytes(head)
+        self._tail = tail
+        self._file_size = os.path.getsize(self.file_path)
+        self._total = len(self._head) + self._file_size + len(self._tail)
+        self._handle = None
+        self._position = 0
+
+    @property
+    def content_type(self):
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self):
+        return self._total
+
+    def read(self, size=-1):
+        if self.cancel is not None and self.cancel.is_set():
+            raise JobCancelled("Upload cancelled")
+        if size is None or size < 0:
+            size = self._total - self._position
+        out = bytearray()
+        while len(out) < size and self._position < self._total:
+            want = size - len(out)
+            head_end = len(self._head)
+            file_end = head_end + self._file_size
+            if self._position < head_end:
+                piece = self._head[self._position:self._position + want]
+            elif self._position < file_end:
+                if self._handle is None:
+                    self._handle = open(self.file_path, "rb")
+                piece = self._handle.read(min(want, file_end - self._position))
+                if not piece:
+                    raise OSError(f"{self.file_path} shrank during upload")
+            else:
+                offset = self._position - file_end
+                piece = self._tail[offset:offset + want]
+            out += piece
+            self._position += len(piece)
+        self.bytes_sent = self._position
+        if self.progress is not None and out:
+            self.progress(self._position, self._total)
+        if self._position >= self._total:
+            self.close()
+        return bytes(out)
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
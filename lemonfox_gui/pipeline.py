@@ -0,0 +1,256 @@
+import time
+from dataclasses import replace
+from pathlib import Path
+
+from .api_client import transcribe_audio
+from .cache import cache_key, open_cache
+from .chunking import needs_chunking, transcribe_chunked
+from .encode import describe_upload, encode_for_upload
+from .export import export_transcript, parse_export_formats
+from .formats import render_verbose
+from .jobs import JobCancelled
+from .metrics import JobMetrics
+from .settings import AppSettings
+from .transcripts import extract_display_text, save_transcript
+from .trim import trim_silence
+from .webhook import parse_callback
+
+# Formats with timestamps that have to be shifted back after silence trimming.
+TIMED_FORMATS = ("verbose_json", "srt", "vtt")
+
+
+def _check(cancel):
+    if cancel is not None and cancel.is_set():
+        raise JobCancelled("Cancelled")
+
+
+def upload_reporter(report, interval: float = 0.25):
+    started = time.monotonic()
+    last = [0.0]
+
+    def progress(sent, total):
+        now = time.monotonic()
+        if now - last[0] < interval and sent < total:
+            return
+        last[0] = now
+        rate = sent / max(now - started, 1e-6)
+        report(f"Uploading {100 * sent // total}% ({sent / 1e6:.1f}/{total / 1e6:.1f} MB, {rate / 1e6:.2f} MB/s)")
+
+    return progress
+
+
+def timed_request(metrics: JobMetrics, settings: AppSettings, path, source_type: str, report, cancel=None):
+    # Splits the request into "upload" (until the last body byte is handed to the socket)
+    # and "server" (processing plus the response). Retries count towards the upload.
+    reporter = upload_reporter(report)
+    upload = {}
+
+    def progress(sent, total):
+        if sent >= total:
+            upload["done"] = time.perf_counter()
+            upload["bytes"] = total
+        reporter(sent, total)
+
+    started = time.perf_counter()
+    result = transcribe_audio(settings, path, source_type, progress=progress, cancel=cancel)
+    finished = time.perf_counter()
+    if "done" in upload:
+        metrics.add("upload", upload["done"] - started, size=upload["bytes"])
+        metrics.add("server", finished - upload["done"])
+    else:
+        metrics.add("request", finished - started)
+    return result
+
+
+def run_transcription(
+    settings: AppSettings,
+    source,
+    source_type: str,
+    progress=None,
+    cancel=None,
+    force=False,
+    metrics=None,
+    save=True,
+):
+    report = progress or (lambda message: None)
+    if source_type == "file":
+        source = Path(source)
+    metrics = metrics or JobMetrics(str(source), source_type)
+    if settings.callback_url:
+        # This path waits for the transcript itself; with a callback_url the API would
+        # only answer with an acknowledgement.
+        settings = replace(settings, callback_url="")
+    wanted = settings
+    exports = parse_export_formats(settings.export_formats) if save else []
+    if exports and settings.response_format != "verbose_json":
+        # One verbose_json request (and cache entry) feeds the chosen format and every export.
+        settings = replace(settings, response_format="verbose_json")
+    upload_path = work_path = source
+    upload_info = None
+    trimmed = None
+    # Only files the pipeline created itself are deleted afterwards.
+    temporary = []
+    request_settings = settings
+    cache = key = cached = None
+    if source_type == "file" and settings.cache_enabled:
+        with metrics.span("cache_lookup"):
+            cache = open_cache(settings)
+            key = cache_key(settings, source)
+            if not force:
+                cached = cache.get(key)
+    try:
+        if cached is not None:
+            report("Loaded transcript from cache.")
+            payload, response_text = cached
+            upload_info = {"cache": "hit", "upload_bytes": 0}
+        else:
+            if source_type == "file" and settings.trim_silence:
+                report("Trimming silence...")
+                with metrics.span("trim") as span:
+                    trimmed = trim_silence(settings, source)
+                    if trimmed is not None:
+                        span["audio_seconds"] = trimmed[2]
+                _check(cancel)
+                if trimmed is not None:
+                    work_path = upload_path = trimmed[0]
+                    temporary.append(trimmed[0])
+                    report(f"Trimmed {trimmed[3]['trim_removed_percent']}% silence.")
+                    if settings.response_format in TIMED_FORMATS:
+                        request_settings = replace(settings, response_format="verbose_json")
+            if source_type == "file" and needs_chunking(request_settings, work_path):
+                report("Splitting long audio into chunks...")
+                with metrics.span("chunked") as span:
+                    payload, response_text, upload_info = transcribe_chunked(
+                        request_settings, work_path, progress=report, cancel=cancel
+                    )
+                    span["bytes"] = upload_info.get("upload_bytes")
+            else:
+                if source_type == "file":
+                    report("Encoding audio...")
+                    with metrics.span("encode") as span:
+                        upload_path, upload_info = encode_for_upload(request_settings, work_path)
+                        if upload_path is not work_path:
+                            temporary.append(upload_path)
+                        if upload_info and trimmed is not None:
+                            # Savings are reported against the user's file, not the trimmed copy.
+                            source_bytes = source.stat().st_size
+                            upload_info = dict(
+                                upload_info,
+                                source_bytes=source_bytes,
+                                bytes_saved=source_bytes - upload_info["upload_bytes"],
+                            )
+                        if upload_info:
+                            span["bytes"] = upload_info["upload_bytes"]
+                            span["audio_seconds"] = upload_info["audio_seconds"]
+                    _check(cancel)
+                    if upload_info:
+                        report(f"Sending {describe_upload(upload_info)}...")
+                    else:
+                        report("Sending to API...")
+                payload, response_text = timed_request(
+                    metrics, request_settings, upload_path, source_type, report, cancel
+                )
+            if trimmed is not None:
+                _, offsets, duration, trim_info = trimmed
+                if request_settings is not settings:
+                    payload, response_text = render_verbose(
+                        offsets.apply(payload, duration), settings.response_format
+                    )
+                upload_info = dict(upload_info or {}, **trim_info)
+        _check(cancel)
+        if cache is not None and cached is None:
+            with metrics.span("cache_put"):
+                cache.put(key, payload, response_text, source=source)
+        verbose = payload
+        if settings is not wanted:
+            payload, response_text = render_verbose(payload, wanted.response_format)
+            settings = wanted
+        display_text = json_path = None
+        # Multi-track jobs merge the track results and save the merged transcript only.
+        if save:
+            with metrics.span("display"):
+                display_text = extract_display_text(settings, payload, response_text)
+            with metrics.span("save"):
+                json_path = save_transcript(settings, payload, response_text, display_text, upload_info, source=source)
+            if exports:
+                report("Writing exports...")
+                with metrics.span("export"):
+                    export_transcript(verbose, json_path.with_suffix(""), exports)
+    finally:
+        for path in temporary:
+            Path(path).unlink(missing_ok=True)
+    return {
+        "payload": payload,
+        "response_text": response_text,
+        "display_text": display_text,
+        "json_path": json_path,
+        "upload_info": upload_info,
+        "metrics": metrics,
+    }
+
+
+def callback_eligible(settings: AppSettings, source, source_type: str):
+    # Chunked and trimmed files need their results stitched or remapped locally, so
+    # they keep using the blocking path.
+    if not settings.callback_url:
+        return False
+    if source_type == "url":
+        return True
+    return source_type == "file" and not settings.trim_silence and not needs_chunking(settings, source)
+
+
+def submit_callback(
+    settings: AppSettings, source, source_type: str, callback_url: str, progress=None, cancel=None, force=False
+):
+    # Sends the job with callback_url and returns once the API has accepted it. Returns
+    # (result, upload_info); result is only set when the transcript came from the cache.
+    report = progress or (lambda message: None)
+    if source_type == "file":
+        source = Path(source)
+    if source_type == "file" and settings.cache_enabled and not force:
+        cached = open_cache(settings).get(cache_key(settings, source))
+        if cached is not None:
+            report("Loaded transcript from cache.")
+            upload_info = {"cache": "hit", "upload_bytes": 0}
+            return _store_result(settings, source, cached[0], cached[1], upload_info), upload_info
+    upload_path = source
+    upload_info = None
+    try:
+        if source_type == "file":
+            report("Encoding audio...")
+            upload_path, upload_info = encode_for_upload(settings, source)
+            _check(cancel)
+        report("Sending to API...")
+        transcribe_audio(
+            replace(settings, callback_url=callback_url),
+            upload_path,
+            source_type,
+            progress=upload_reporter(report),
+            cancel=cancel,
+        )
+    finally:
+        if upload_path is not source:
+            Path(upload_path).unlink(missing_ok=True)
+    return None, dict(upload_info or {}, callback=True)
+
+
+def finish_callback(settings: AppSettings, source, source_type: str, body: bytes, content_type: str, upload_info=None):
+    payload, response_text = parse_callback(body, content_type, settings.response_format)
+    if source_type == "file" and settings.cache_enabled:
+        open_cache(settings).put(cache_key(settings, source), payload, response_text, source=source)
+    return _store_result(settings, source, payload, response_text, upload_info)
+
+
+def _store_result(settings: AppSettings, source, payload, response_text, upload_info):
+    display_text = extract_display_text(settings, payload, response_text)
+    json_path = save_transcript(settings, payload, response_text, display_text, upload_info, source=source)
+    exports = parse_export_formats(settings.export_formats)
+    if exports and settings.response_format == "verbose_json":
+        export_transcript(payload, json_path.with_suffix(""), exports)
+    return {
+        "payload": payload,
+        "response_text": response_text,
+        "display_text": display_text,
+        "json_path": json_path,
+        "upload_info": upload_info,
+    }
@@ -10,6 +10,11 @@ SETTINGS_PATH = APP_DIR / "settings.json"
 class AppSettings:
     api_token: str = ""
     api_base: str = "https://api.lemonfox.ai"
+    endpoint_mode: str = "fixed"
+    api_endpoints: str = ""
+    eu_only: bool = False
+    hedge_requests: bool = False
+    hedge_max_mb: str = "5"
     language: str = ""
     response_format: str = "json"
     prompt: str = ""
@@ -19,10 +24,54 @@ class AppSettings:
     max_speakers: str = ""
     word_timestamps: bool = False
     callback_url: str = ""
+    callback_listen: str = "127.0.0.1:8765"
     audio_dir: str = str(APP_DIR / "audio")
     text_dir: str = str(APP_DIR / "text")
+    input_device: str = ""
     sample_rate: str = "16000"
     channels: str = "1"
+    capture_format: str = "int16"
+    multitrack: bool = False
+    tracks: str = ""
+    track_names: str = ""
+    spill_to_disk: bool = False
+    recording_format: str = "wav"
+    upload_codec: str = "flac"
+    upload_mono: bool = False
+    upload_resample: bool = False
+    chunk_minutes: str = "10"
+    chunk_overlap: str = "2"
+    chunk_workers: str = "4"
+    connect_timeout: str = "10"
+    read_timeout: str = "300"
+    max_retries: str = "3"
+    max_jobs: str = "2"
+    batch_workers: str = "4"
+    cache_enabled: bool = True
+    cache_max_mb: str = "500"
+    cache_max_days: str = "90"
+    import_mode: str = "link"
+    live_mode: bool = False
+    live_pause_ms: str = "600"
+    trim_silence: bool = False
+    trim_min_gap_ms: str = "700"
+    trim_keep_ms: str = "300"
+    export_formats: str = ""
+    metrics_log: bool = True
+    profile_mode: str = "off"
+
+
+def resolve_dir(path_value, fallback):
+    if not path_value:
+        return Path(fallback)
+    return Path(path_value)
+
+
+def parse_int(value, default: int):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
 
 
 def load_settings():
@@ -0,0 +1,234 @@
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from .settings import APP_DIR
+
+STORE_PATH = APP_DIR / "history.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY,
+    json_path TEXT NOT NULL UNIQUE,
+    folder TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    saved_at TEXT,
+    source TEXT,
+    response_format TEXT,
+    request TEXT,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS transcripts_folder ON transcripts(folder);
+CREATE INDEX IF NOT EXISTS transcripts_source ON transcripts(source);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    transcript_id INTEGER NOT NULL REFERENCES transcripts(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    start_time REAL,
+    end_time REAL,
+    speaker TEXT,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_transcript ON segments(transcript_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text, speaker, content='segments', content_rowid='id'
+);
+"""
+
+RESULT_COLUMNS = (
+    "transcript_id", "json_path", "saved_at", "source", "response_format",
+    "position", "start", "end", "speaker", "snippet",
+)
+
+
+def fts_query(text: str):
+    # Every word is quoted so user input can never be read as FTS5 syntax; a trailing
+    # "*" keeps prefix search working.
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"*' if prefix else f'"{word}"')
+    return " ".join(terms)
+
+
+def transcript_segments(record):
+    payload = record.get("data")
+    segments = payload.get("segments") if isinstance(payload, dict) else None
+    if segments:
+        for seg in segments:
+            text = (seg.get("text") or "").strip()
+            if text:
+                yield seg.get("start"), seg.get("end"), seg.get("speaker"), text
+        return
+    # json/text/srt/vtt results have no segment list: index the transcript as one row.
+    text = (record.get("text") or "").strip()
+    if text:
+        yield None, None, None, text
+
+
+class TranscriptStore:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+    def _remove(self, transcript_id):
+        # segments_fts is an external-content index: rows must be deleted with their
+        # old values before the segments themselves go away.
+        self._conn.execute(
+            "INSERT INTO segments_fts(segments_fts, rowid, text, speaker) "
+            "SELECT 'delete', id, text, coalesce(speaker, '') FROM segments WHERE transcript_id = ?",
+            (transcript_id,),
+        )
+        self._conn.execute("DELETE FROM transcripts WHERE id = ?", (transcript_id,))
+
+    def _add(self, json_path: Path, record, stat):
+        existing = self._conn.execute(
+            "SELECT id FROM transcripts WHERE json_path = ?", (str(json_path),)
+        ).fetchone()
+        if existing:
+            self._remove(existing[0])
+        payload = record.get("data")
+        duration = payload.get("duration") if isinstance(payload, dict) else None
+        cursor = self._conn.execute(
+            "INSERT INTO transcripts "
+            "(json_path, folder, mtime, size, saved_at, source, response_format, request, duration) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                str(json_path),
+                str(json_path.parent),
+                stat.st_mtime,
+                stat.st_size,
+                record.get("saved_at"),
+                record.get("source"),
+                record.get("response_format"),
+                json.dumps(record.get("request")) if record.get("request") else None,
+                duration,
+            ),
+        )
+        transcript_id = cursor.lastrowid
+        for position, (start, end, speaker, text) in enumerate(transcript_segments(record)):
+            cursor = self._conn.execute(
+                "INSERT INTO segments (transcript_id, position, start_time, end_time, speaker, text) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (transcript_id, position, start, end, speaker, text),
+            )
+            self._conn.execute(
+                "INSERT INTO segments_fts(rowid, text, speaker) VALUES (?, ?, ?)",
+                (cursor.lastrowid, text, speaker or ""),
+            )
+
+    def add(self, json_path, record):
+        json_path = Path(json_path)
+        stat = os.stat(json_path)
+        with self._lock, self._conn:
+            self._add(json_path, record, stat)
+
+    def sync(self, folder):
+        # Imports new or changed transcript_*.json files and forgets deleted ones.
+        # Unchanged files are recognised by size and mtime and never re-read.
+        folder = Path(folder)
+        on_disk = {}
+        if folder.is_dir():
+            for entry in os.scandir(folder):
+                # transcript_<time>.json only; exports such as transcript_<time>.words.json are not transcripts.
+                name = entry.name
+                if name.startswith("transcript_") and name.endswith(".json") and name.count(".") == 1 and entry.is_file():
+                    on_disk[str(folder / entry.name)] = entry.stat()
+        with self._lock:
+            known = {
+                path: (transcript_id, mtime, size)
+                for transcript_id, path, mtime, size in self._conn.execute(
+                    "SELECT id, json_path, mtime, size FROM transcripts WHERE folder = ?", (str(folder),)
+                )
+            }
+        imported = removed = 0
+        for path, stat in on_disk.items():
+            entry = known.get(path)
+            if entry is not None and entry[1] == stat.st_mtime and entry[2] == stat.st_size:
+                continue
+            try:
+                record = json.loads(Path(path).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            with self._lock, self._conn:
+                self._add(Path(path), record, stat)
+            imported += 1
+        with self._lock, self._conn:
+            for path, (transcript_id, _, _) in known.items():
+                if path not in on_disk:
+                    self._remove(transcript_id)
+                    removed += 1
+        return imported, removed
+
+    def sources(self, folder):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT source FROM transcripts WHERE folder = ? AND source IS NOT NULL", (str(folder),)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def search(self, text="", speaker="", start=None, end=None, limit=200):
+        # Matches segment text with FTS5; speaker and time range narrow the hits. With no
+        # text the newest matching segments are returned.
+        where = []
+        params = []
+        query = fts_query(text)
+        if query:
+            source = "segments_fts JOIN segments s ON s.id = segments_fts.rowid"
+            snippet = "snippet(segments_fts, 0, '[', ']', '...', 12)"
+            where.append("segments_fts MATCH ?")
+            params.append(query)
+            order = "bm25(segments_fts)"
+        else:
+            source = "segments s"
+            snippet = "substr(s.text, 1, 120)"
+            order = "t.saved_at DESC, s.position"
+        if speaker:
+            where.append("s.speaker = ? COLLATE NOCASE")
+            params.append(speaker)
+        if start is not None:
+            where.append("s.end_time >= ?")
+            params.append(start)
+        if end is not None:
+            where.append("s.start_time <= ?")
+            params.append(end)
+        sql = (
+            f"SELECT t.id, t.json_path, t.saved_at, t.source, t.response_format, "
+            f"s.position, s.start_time, s.end_time, s.speaker, {snippet} "
+            f"FROM {source} JOIN transcripts t ON t.id = s.transcript_id"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order} LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(zip(RESULT_COLUMNS, row)) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(path=STORE_PATH):
+    with _stores_lock:
+        store = _stores.get(str(path))
+        if store is None:
+            store = TranscriptStore(path)
+            _stores[str(path)] = store
+        return store
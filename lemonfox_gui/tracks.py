@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import replace
+
+from .export import export_transcript, parse_export_formats
+from .formats import render_verbose, segment_text
+from .jobs import JobCancelled
+from .pipeline import run_transcription
+from .settings import AppSettings
+from .transcripts import extract_display_text, save_transcript
+
+
+def track_names(settings: AppSettings, count: int):
+    names = [name.strip() for name in (settings.track_names or "").split(";")]
+    return [names[index] if index < len(names) and names[index] else f"Speaker {index + 1}" for index in range(count)]
+
+
+def merge_tracks(named_payloads):
+    # Every track is one speaker: label its segments and interleave them by start time.
+    segments = []
+    for name, payload in named_payloads:
+        for seg in payload.get("segments") or []:
+            seg = dict(seg, speaker=name)
+            if seg.get("words"):
+                seg["words"] = [dict(word, speaker=name) for word in seg["words"]]
+            segments.append(seg)
+    segments.sort(key=lambda seg: (seg.get("start", 0), seg.get("end", 0)))
+    for index, seg in enumerate(segments):
+        seg["id"] = index
+    first = named_payloads[0][1] if named_payloads else {}
+    return {
+        "task": first.get("task", "transcribe"),
+        "language": first.get("language"),
+        "duration": max((payload.get("duration") or 0 for _, payload in named_payloads), default=0),
+        "text": "\n".join(segment_text(seg) for seg in segments if (seg.get("text") or "").strip()),
+        "segments": segments,
+    }
+
+
+def transcribe_tracks(settings: AppSettings, tracks, progress=None, cancel=None, force=False, metrics=None):
+    # tracks is a list of (speaker name, audio path). Each track is a full pipeline run
+    # (cache, trim, chunking, encode) of its own, all tracks in parallel.
+    report = progress or (lambda message: None)
+    track_settings = replace(settings, response_format="verbose_json", speaker_labels=False)
+
+    def run(name, path):
+        return run_transcription(
+            track_settings,
+            path,
+            "file",
+            progress=lambda message: report(f"{name}: {message}"),
+            cancel=cancel,
+            force=force,
+            metrics=metrics,
+            save=False,
+        )
+
+    results = [None] * len(tracks)
+    with ThreadPoolExecutor(max_workers=max(1, len(tracks))) as pool:
+        futures = {pool.submit(run, name, path): index for index, (name, path) in enumerate(tracks)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except JobCancelled:
+                raise
+            except Exception as exc:
+                raise RuntimeError(f"Track {tracks[index][0]} failed: {exc}") from exc
+    merged = merge_tracks([(name, result["payload"]) for (name, _), result in zip(tracks, results)])
+    payload, response_text = render_verbose(merged, settings.response_format)
+    display_text = extract_display_text(settings, payload, response_text)
+    info = {
+        "tracks": [
+            dict(result["upload_info"] or {}, speaker=name, source=str(path))
+            for (name, path), result in zip(tracks, results)
+        ],
+    }
+    json_path = save_transcript(settings, payload, response_text, display_text, info, source=tracks[0][1])
+    exports = parse_export_formats(settings.export_formats)
+    if exports:
+        report("Writing exports...")
+        export_transcript(merged, json_path.with_suffix(""), exports)
+    return {
+        "payload": payload,
+        "response_text": response_text,
+        "display_text": display_text,
+        "json_path": json_path,
+        "upload_info": info,
+    }
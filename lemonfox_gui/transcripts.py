@@ -0,0 +1,74 @@
+import json
+import sqlite3
+from datetime import datetime
+
+from .cache import KEY_FIELDS
+from .settings import AppSettings, resolve_dir, APP_DIR
+from .store import open_store
+
+
+def segment_line(seg):
+    start = seg.get("start")
+    end = seg.get("end")
+    speaker = seg.get("speaker")
+    text = seg.get("text", "")
+    ts = ""
+    if start is not None and end is not None:
+        ts = f"[{start:>6.2f}-{end:>6.2f}]"
+    speaker_part = f"{speaker}: " if speaker else ""
+    return f"{ts} {speaker_part}{text}".strip()
+
+
+def extract_display_text(settings: AppSettings, payload, response_text):
+    if payload is None:
+        return response_text or ""
+    if settings.response_format == "json":
+        return payload.get("text", "")
+    if settings.response_format == "verbose_json":
+        lines = [line for line in map(segment_line, payload.get("segments", [])) if line]
+        if lines:
+            return "\n".join(lines)
+        return payload.get("text", "")
+    return ""
+
+
+def save_transcript(settings: AppSettings, payload, response_text, display_text, upload_info=None, source=None):
+    text_dir = resolve_dir(settings.text_dir, APP_DIR / "text")
+    text_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    result = {
+        "saved_at": timestamp,
+        "response_format": settings.response_format,
+        "data": payload,
+        "text": display_text or response_text,
+        "request": {name: getattr(settings, name) for name in KEY_FIELDS},
+    }
+    if source is not None:
+        result["source"] = str(source)
+    if upload_info:
+        result["upload"] = upload_info
+    content = json.dumps(result, ensure_ascii=True, indent=2)
+    # Parallel jobs can finish within the same second; never overwrite another transcript.
+    suffix = 1
+    while True:
+        name = f"transcript_{timestamp}.json" if suffix == 1 else f"transcript_{timestamp}_{suffix}.json"
+        json_path = text_dir / name
+        try:
+            with open(json_path, "x", encoding="utf-8") as handle:
+                handle.write(content)
+            break
+        except FileExistsError:
+            suffix += 1
+    try:
+        open_store().add(json_path, result)
+    except sqlite3.Error:
+        # The JSON file is the source of truth; the next sync picks it up.
+        pass
+    return json_path
+
+
+def transcribed_sources(settings: AppSettings):
+    text_dir = resolve_dir(settings.text_dir, APP_DIR / "text")
+    store = open_store()
+    store.sync(text_dir)
+    return store.sources(text_dir)
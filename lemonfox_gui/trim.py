@@ -0,0 +1,114 @@
+import os
+import tempfile
+import time
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import soundfile as sf
+
+from .dsp import frame_rms
+from .settings import AppSettings, parse_int
+
+FRAME_SECONDS = 0.02
+NOISE_PERCENTILE = 10
+SILENCE_MARGIN_DB = 10.0
+SILENCE_CEILING_DB = -50.0
+BLOCK_FRAMES = 65536
+MIN_SAVING = 0.01
+
+
+class OffsetMap:
+    # Maps times in the trimmed upload back to the original recording. Each entry is
+    # (trimmed_start, original_start) in seconds for one kept stretch of audio.
+    def __init__(self, pieces):
+        self._trimmed = [trimmed for trimmed, _ in pieces]
+        self._original = [original for _, original in pieces]
+
+    def map(self, seconds, end=False):
+        # An end time that lands exactly on a cut belongs to the piece before it.
+        search = bisect_left if end else bisect_right
+        index = max(0, search(self._trimmed, seconds) - 1)
+        return round(self._original[index] + seconds - self._trimmed[index], 3)
+
+    def _map_items(self, items):
+        for item in items or []:
+            for key in ("start", "end"):
+                if item.get(key) is not None:
+                    item[key] = self.map(item[key], end=key == "end")
+
+    def apply(self, payload, duration=None):
+        self._map_items(payload.get("segments"))
+        for seg in payload.get("segments") or []:
+            self._map_items(seg.get("words"))
+        self._map_items(payload.get("words"))
+        if duration is not None and "duration" in payload:
+            payload["duration"] = round(duration, 3)
+        return payload
+
+
+def silence_ranges(levels_db, min_gap_frames: int):
+    threshold = max(np.percentile(levels_db, NOISE_PERCENTILE) + SILENCE_MARGIN_DB, SILENCE_CEILING_DB)
+    silent = np.concatenate([[False], levels_db < threshold, [False]])
+    edges = np.flatnonzero(np.diff(silent.astype(np.int8)))
+    starts, ends = edges[0::2], edges[1::2]
+    long_enough = ends - starts >= min_gap_frames
+    return starts[long_enough], ends[long_enough]
+
+
+def kept_ranges(total: int, frame_len: int, gap_starts, gap_ends, keep_frames: int):
+    # Each long gap is shortened to keep_frames, split evenly around the cut.
+    head = keep_frames // 2
+    tail = keep_frames - head
+    cut_starts = (gap_starts + head) * frame_len
+    cut_ends = np.minimum((gap_ends - tail) * frame_len, total)
+    starts = np.concatenate([[0], cut_ends])
+    ends = np.concatenate([cut_starts, [total]])
+    keep = ends > starts
+    return starts[keep], ends[keep]
+
+
+def trim_silence(settings: AppSettings, path):
+    started = time.perf_counter()
+    try:
+        source = sf.SoundFile(path)
+    except sf.LibsndfileError:
+        return None
+    with source:
+        rate = source.samplerate
+        total = source.frames
+        frame_len = max(1, int(FRAME_SECONDS * rate))
+        levels = np.concatenate(
+            [frame_rms(block, frame_len) for block in source.blocks(frame_len * 4096, dtype="float32", always_2d=True)]
+            or [np.empty(0, dtype=np.float32)]
+        )
+        if len(levels) == 0:
+            return None
+        levels_db = 20 * np.log10(np.maximum(levels, 1e-6))
+        min_gap = max(1, parse_int(settings.trim_min_gap_ms, 700) // int(FRAME_SECONDS * 1000))
+        keep = max(0, parse_int(settings.trim_keep_ms, 300) // int(FRAME_SECONDS * 1000))
+        gap_starts, gap_ends = silence_ranges(levels_db, max(min_gap, keep + 1))
+        starts, ends = kept_ranges(total, frame_len, gap_starts, gap_ends, keep)
+        kept = int((ends - starts).sum())
+        removed = total - kept
+        if removed < total * MIN_SAVING:
+            return None
+
+        fd, target = tempfile.mkstemp(prefix="trimmed_", suffix=".wav")
+        os.close(fd)
+        pieces = []
+        written = 0
+        # Keep the source's sample format where WAV can hold it; compressed input becomes PCM_16.
+        subtype = source.subtype if sf.check_format("WAV", source.subtype) else "PCM_16"
+        with sf.SoundFile(target, "w", samplerate=rate, channels=source.channels, subtype=subtype) as out:
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                pieces.append((written / rate, start / rate))
+                source.seek(start)
+                for block in source.blocks(BLOCK_FRAMES, frames=end - start, dtype="float32", always_2d=True):
+                    out.write(block)
+                written += end - start
+    info = {
+        "trim_removed_seconds": round(removed / rate, 3),
+        "trim_removed_percent": round(100 * removed / total, 1),
+        "trim_seconds": round(time.perf_counter() - started, 3),
+    }
+    return target, OffsetMap(pieces), total / rate, info
@@ -1,15 +1,34 @@
+import importlib
 import json
 import queue
+import sqlite3
 import threading
+import time
+from dataclasses import replace
 from datetime import datetime
 from pathlib import Path
-from tkinter import Toplevel, StringVar, BooleanVar, Text, END, ttk, filedialog, messagebox
+from tkinter import Toplevel, StringVar, BooleanVar, ttk, filedialog, messagebox
 
-import soundfile as sf
+from .jobs import JobCancelled, JobScheduler, PRIORITY_BULK, PRIORITY_FILE, PRIORITY_LIVE
+from .journal import open_journal, restore_settings, transcript_source
+from .metrics import PROFILE_MODES, JobMetrics, log_metrics, profiled
+from .settings import AppSettings, load_settings, save_settings, parse_int, resolve_dir, APP_DIR
+from .store import open_store
+from .transcripts import extract_display_text, save_transcript, transcribed_sources
+from .viewer import TranscriptView, parse_timestamp
 
-from .api_client import transcribe_audio
-from .audio import AudioRecorder
-from .settings import AppSettings, load_settings, save_settings, APP_DIR
+# numpy, sounddevice (PortAudio device scan), soundfile and requests are only needed
+# once something is recorded or sent. They are imported after the window is up, in
+# the background, or on first use, whichever comes first.
+WARM_UP_MODULES = (
+    "lemonfox_gui.pipeline",
+    "lemonfox_gui.audio",
+    "lemonfox_gui.live",
+    "lemonfox_gui.batch",
+    "lemonfox_gui.importer",
+)
+# How long a callback that beat the end of its submit waits for the submit to return.
+CALLBACK_SUBMIT_WAIT = 30
 
 
 class App:
@@ -17,18 +36,140 @@ class App:
         self.root = root
         self.root.title("Lemonfox Transkriptor")
 
-        self.settings = load_settings()
-        self.recorder = AudioRecorder()
+        self._settings = None
+        self._settings_ready = threading.Event()
+        self._recorder = None
+        self._multitrack = None
+        self.track_sources = []
+        self.journal = None
         self.task_queue = queue.Queue()
+        self.scheduler = JobScheduler(self._transcribe_worker, on_change=self._job_changed)
 
         self.status_var = StringVar(value="Ready")
+        self.timing_var = StringVar(value="")
         self.toggle_active = False
+        self.recording_path = None
+        self.live_session = None
+        self.webhook = None
+        self.capture_timings = {}
+        self.shown = (None, None)
+        self.force_var = BooleanVar(value=False)
+        self.jump_var = StringVar()
 
         self._build_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self._poll_queue()
+        threading.Thread(target=self._warm_up, daemon=True).start()
+
+    @property
+    def settings(self):
+        # Loaded off the main thread during startup; the first use waits for it.
+        self._settings_ready.wait()
+        return self._settings
+
+    @settings.setter
+    def settings(self, value):
+        self._settings = value
+        self._settings_ready.set()
+
+    @property
+    def recorder(self):
+        if self._recorder is None:
+            from .audio import AudioRecorder
+
+            self._recorder = AudioRecorder()
+        return self._recorder
+
+    @property
+    def recording(self):
+        if self._multitrack is not None and self._multitrack.recording:
+            return True
+        return self._recorder is not None and self._recorder.recording
+
+    def _warm_up(self):
+        try:
+            settings = load_settings()
+        except OSError:
+            settings = AppSettings()
+        self.scheduler.set_max_workers(parse_int(settings.max_jobs, 2))
+        try:
+            self.journal = open_journal()
+        except (OSError, sqlite3.Error):
+            # Without a journal jobs still run; they just are not resumed after a crash.
+            self.journal = None
+        self.settings = settings
+        if self.journal is not None:
+            self._resume_jobs(settings)
+        for name in WARM_UP_MODULES:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                # e.g. no PortAudio: reported when the feature is actually used.
+                pass
+
+    def _resume_jobs(self, settings):
+        # Jobs the last session left queued, running or waiting are queued again. If the
+        # transcript was saved before the journal caught up, the entry is only closed.
+        entries = self.journal.unfinished()
+        if not entries or not settings.api_token:
+            return
+        done = {}
+        resumed = 0
+        for entry in entries:
+            job_settings = restore_settings(entry["settings"], settings)
+            source, source_type = entry["source"], entry["source_type"]
+            if not entry["force"] and source_type != "folder":
+                if job_settings.text_dir not in done:
+                    try:
+                        done[job_settings.text_dir] = transcribed_sources(job_settings)
+                    except sqlite3.Error:
+                        done[job_settings.text_dir] = set()
+                if transcript_source(source, source_type) in done[job_settings.text_dir]:
+                    self.journal.set_state(entry["key"], "done", "transcript already saved")
+                    continue
+            paths = [path for _, path in source] if source_type == "tracks" else [source]
+            if source_type != "url" and not all(Path(path).exists() for path in paths):
+                self.journal.set_state(entry["key"], "failed", "source no longer exists")
+                continue
+            job = self.scheduler.submit(
+                source,
+                source_type,
+                priority=entry["priority"],
+                label=entry["label"],
+                force=entry["force"],
+                settings=job_settings,
+            )
+            self.journal.attach(entry["key"], job)
+            resumed += 1
+        if resumed:
+            self.report_status(f"Resumed {resumed} unfinished job(s) from the last session.")
+
+    def _job_changed(self, job):
+        self.task_queue.put(("job", job.id, None, None))
+        if self.journal is not None:
+            self.journal.update(job)
+
+    def on_close(self):
+        # A recording in progress is stopped so its file is complete and the capture
+        # buffers (and their spill files) are freed.
+        if self.live_session is not None:
+            self.live_session.pause()
+        for recorder in (self._recorder, self._multitrack):
+            if recorder is None:
+                continue
+            try:
+                recorder.stop()
+            except RuntimeError:
+                pass
+        if self._recorder is not None:
+            self._recorder.release()
+        # Running jobs stay "running" in the journal and are resumed on the next launch.
+        if self.journal is not None:
+            self.journal.close()
+        self.root.destroy()
 
     def _build_ui(self):
-        self.root.minsize(780, 520)
+        self.root.minsize(780, 660)
         style = ttk.Style()
         style.configure("Header.TLabel", font=("Segoe UI", 16, "bold"))
         style.configure("Subtle.TLabel", foreground="#666666")
@@ -48,8 +189,11 @@ class App:
         ttk.Label(header, text="Record, transcribe, and save.", style="Subtle.TLabel").grid(
             row=1, column=0, sticky="w", pady=(2, 0)
         )
+        ttk.Button(header, text="History", command=self.open_history).grid(
+            row=0, column=1, rowspan=2, sticky="e", padx=(0, 8)
+        )
         ttk.Button(header, text="Settings", command=self.open_settings).grid(
-            row=0, column=1, rowspan=2, sticky="e"
+            row=0, column=2, rowspan=2, sticky="e"
         )
 
         left = ttk.Frame(container)
@@ -75,21 +219,55 @@ class App:
         ttk.Button(controls, text="Transcribe URL", command=self.transcribe_url_dialog).grid(
             row=1, column=1, pady=(10, 0), sticky="w", padx=(10, 0)
         )
+        ttk.Button(controls, text="Transcribe Folder", command=self.transcribe_folder_dialog).grid(
+            row=1, column=2, pady=(10, 0), sticky="w", padx=(10, 0)
+        )
+        ttk.Checkbutton(controls, text="Force re-transcribe", variable=self.force_var).grid(
+            row=1, column=3, pady=(10, 0), sticky="w", padx=(10, 0)
+        )
 
         output_frame = ttk.Labelframe(left, text="Transcript", style="Section.TLabelframe")
         output_frame.grid(row=1, column=0, sticky="nsew", pady=(12, 0))
         left.rowconfigure(1, weight=1)
-        output_frame.rowconfigure(0, weight=1)
+        output_frame.rowconfigure(1, weight=1)
         output_frame.columnconfigure(0, weight=1)
 
-        self.output = Text(output_frame, height=18, wrap="word")
-        self.output.grid(row=0, column=0, sticky="nsew")
-        scrollbar = ttk.Scrollbar(output_frame, orient="vertical", command=self.output.yview)
-        scrollbar.grid(row=0, column=1, sticky="ns")
-        self.output.configure(yscrollcommand=scrollbar.set)
+        jump_row = ttk.Frame(output_frame)
+        jump_row.grid(row=0, column=0, sticky="e", pady=(0, 6))
+        ttk.Label(jump_row, text="Jump to (h:mm:ss)").grid(row=0, column=0, padx=(0, 6))
+        jump_entry = ttk.Entry(jump_row, textvariable=self.jump_var, width=10)
+        jump_entry.grid(row=0, column=1)
+        jump_entry.bind("<Return>", lambda event: self.jump_to_timestamp())
+        ttk.Button(jump_row, text="Go", command=self.jump_to_timestamp).grid(row=0, column=2, padx=(6, 0))
+        ttk.Button(jump_row, text="Export...", command=self.export_shown).grid(row=0, column=3, padx=(12, 0))
+
+        self.output = TranscriptView(output_frame, height=18, wrap="word")
+        self.output.grid(row=1, column=0, sticky="nsew")
+
+        jobs_frame = ttk.Labelframe(left, text="Jobs", style="Section.TLabelframe")
+        jobs_frame.grid(row=2, column=0, sticky="ew", pady=(12, 0))
+        jobs_frame.columnconfigure(0, weight=1)
+        left.columnconfigure(0, weight=1)
+
+        self.jobs_view = ttk.Treeview(
+            jobs_frame, columns=("source", "state", "elapsed"), height=5, selectmode="browse"
+        )
+        self.jobs_view.heading("#0", text="Job")
+        self.jobs_view.heading("source", text="Source")
+        self.jobs_view.heading("state", text="State")
+        self.jobs_view.heading("elapsed", text="Elapsed")
+        self.jobs_view.column("#0", width=60, stretch=False)
+        self.jobs_view.column("state", width=90, stretch=False)
+        self.jobs_view.column("elapsed", width=80, stretch=False, anchor="e")
+        self.jobs_view.grid(row=0, column=0, sticky="ew")
+        ttk.Button(jobs_frame, text="Cancel Job", command=self.cancel_selected_job).grid(
+            row=0, column=1, padx=(10, 0), sticky="n"
+        )
 
         status = ttk.Label(container, textvariable=self.status_var, anchor="w", style="Subtle.TLabel")
         status.grid(row=2, column=0, sticky="ew", pady=(10, 0))
+        timing = ttk.Label(container, textvariable=self.timing_var, anchor="w", style="Subtle.TLabel")
+        timing.grid(row=3, column=0, sticky="ew")
 
     def on_record_press(self, event):
         if self.toggle_active:
@@ -102,7 +280,7 @@ class App:
         self.stop_recording()
 
     def on_toggle_click(self):
-        if self.recorder.recording:
+        if self.recording:
             self.stop_recording()
             self.toggle_active = False
             self.toggle_button.configure(text="Click to Start")
@@ -112,7 +290,7 @@ class App:
             self.start_recording()
 
     def start_recording(self):
-        if self.recorder.recording:
+        if self.recording:
             return
         try:
             sample_rate = int(self.settings.sample_rate)
@@ -120,27 +298,135 @@ class App:
         except ValueError:
             messagebox.showerror("Invalid settings", "Sample rate and channels must be numbers.")
             return
-        self.recorder.start(sample_rate, channels)
-        self.status_var.set("Recording...")
+        spill_dir = None
+        if self.settings.spill_to_disk:
+            spill_dir = self.resolve_dir(self.settings.audio_dir, APP_DIR / "audio")
+        file_format = self.settings.recording_format or "wav"
+        if self.settings.multitrack:
+            self.start_multitrack(sample_rate, spill_dir, file_format)
+            return
+        from .audio import parse_device
+
+        self.recording_path = self.new_recording_path(file_format)
+        try:
+            self.recorder.start(
+                sample_rate,
+                channels,
+                spill_dir=spill_dir,
+                output_path=self.recording_path,
+                file_format=file_format.upper(),
+                dtype=self.settings.capture_format or "int16",
+                device=parse_device(self.settings.input_device),
+            )
+        except Exception as exc:
+            self.status_var.set(f"Error: {exc}")
+            return
+        if self.settings.live_mode and self.settings.api_token:
+            from .live import LiveSession
+
+            self.output.clear()
+            self.live_session = LiveSession(
+                self.settings,
+                self.recorder.buffer,
+                sample_rate,
+                on_text=lambda text: self.task_queue.put(("live", None, text, None)),
+            )
+            self.status_var.set(f"Recording (live{self.capture_note(', ')})...")
+            return
+        self.status_var.set(f"Recording{self.capture_note(' (', ')')}...")
+
+    def capture_note(self, prefix="", suffix=""):
+        # Mentions the device format when it is converted while recording.
+        rate, channels, _ = self.recorder.device_format
+        if (rate, channels) == (self.recorder.sample_rate, self.recorder.buffer.channels):
+            return ""
+        return f"{prefix}device {rate} Hz/{channels} ch -> {self.recorder.sample_rate} Hz{suffix}"
+
+    def start_multitrack(self, sample_rate, spill_dir, file_format):
+        from .audio import MultiTrackRecorder, parse_tracks
+        from .tracks import track_names
+
+        try:
+            tracks = parse_tracks(self.settings.tracks)
+        except ValueError:
+            messagebox.showerror("Invalid settings", 'Tracks must look like "Mic A; Mic B" or "Interface#1; Interface#2".')
+            return
+        if not tracks:
+            messagebox.showerror("Invalid settings", "Multi-track recording needs at least one track in Settings.")
+            return
+        base = self.new_recording_path(file_format)
+        paths = [base.with_name(f"{base.stem}_track{index + 1}{base.suffix}") for index in range(len(tracks))]
+        if self._multitrack is None:
+            self._multitrack = MultiTrackRecorder()
+        try:
+            self._multitrack.start(
+                sample_rate,
+                tracks,
+                paths,
+                spill_dir=spill_dir,
+                file_format=file_format.upper(),
+                dtype=self.settings.capture_format or "int16",
+            )
+        except Exception as exc:
+            self.status_var.set(f"Error: {exc}")
+            return
+        self.recording_path = paths[0]
+        self.track_sources = list(zip(track_names(self.settings, len(tracks)), paths))
+        self.status_var.set(f"Recording {len(tracks)} tracks...")
+
+    def stop_multitrack(self):
+        self.status_var.set("Processing audio...")
+        started = time.perf_counter()
+        try:
+            frames = self._multitrack.stop()
+        except RuntimeError as exc:
+            self.status_var.set(f"Error: {exc}")
+            return
+        captured = [(source, count) for source, count in zip(self.track_sources, frames) if count]
+        if not captured:
+            self.status_var.set("No audio captured.")
+            return
+        sources = [source for source, _ in captured]
+        self.capture_timings[str(sources[0][1])] = (time.perf_counter() - started, captured[0][1])
+        self.queue_transcription(sources, source_type="tracks", priority=PRIORITY_LIVE)
 
     def stop_recording(self):
-        if not self.recorder.recording:
+        if not self.recording:
+            return
+        if self._multitrack is not None and self._multitrack.recording:
+            self.stop_multitrack()
             return
-        audio = self.recorder.stop()
         self.status_var.set("Processing audio...")
-        if audio is None:
+        session, self.live_session = self.live_session, None
+        if session is not None:
+            session.pause()
+        started = time.perf_counter()
+        try:
+            frames = self.recorder.stop()
+        except RuntimeError as exc:
+            self.recorder.release()
+            self.status_var.set(f"Error: {exc}")
+            return
+        if session is not None:
+            # Reads the rest of the buffer; the session keeps its own copies after that.
+            session.stop()
+        self.recorder.release()
+        if not frames:
             self.status_var.set("No audio captured.")
             return
-        audio_path = self.save_audio(audio)
-        self.queue_transcription(audio_path, source_type="file")
+        # Picked up by the job's metrics so the stop/flush cost shows in its breakdown.
+        self.capture_timings[str(self.recording_path)] = (time.perf_counter() - started, frames)
+        if session is not None:
+            session.recording_path = self.recording_path
+            self.queue_transcription(session, source_type="live", priority=PRIORITY_LIVE)
+            return
+        self.queue_transcription(self.recording_path, source_type="file", priority=PRIORITY_LIVE)
 
-    def save_audio(self, audio):
+    def new_recording_path(self, file_format="wav"):
         audio_dir = self.resolve_dir(self.settings.audio_dir, APP_DIR / "audio")
         audio_dir.mkdir(parents=True, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        audio_path = audio_dir / f"recording_{timestamp}.wav"
-        sf.write(audio_path, audio, int(self.settings.sample_rate))
-        return audio_path
+        return audio_dir / f"recording_{timestamp}.{file_format}"
 
     def transcribe_file_dialog(self):
         path = filedialog.askopenfilename(
@@ -149,9 +435,13 @@ class App:
         )
         if not path:
             return
-        audio_path = Path(path)
-        stored_path = self.copy_audio_file(audio_path)
-        self.queue_transcription(stored_path, source_type="file")
+        self.queue_transcription(Path(path), source_type="import")
+
+    def transcribe_folder_dialog(self):
+        path = filedialog.askdirectory(title="Select folder to transcribe")
+        if not path:
+            return
+        self.queue_transcription(path, source_type="folder", priority=PRIORITY_BULK)
 
     def transcribe_url_dialog(self):
         dialog = Toplevel(self.root)
@@ -175,136 +465,495 @@ class App:
             row=2, column=0, padx=10, pady=(6, 10), sticky="e"
         )
 
-    def copy_audio_file(self, audio_path: Path):
+    def import_audio_file(self, audio_path, job=None):
         audio_dir = self.resolve_dir(self.settings.audio_dir, APP_DIR / "audio")
-        audio_dir.mkdir(parents=True, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        target = audio_dir / f"{audio_path.stem}_{timestamp}{audio_path.suffix}"
-        if audio_path.resolve() != target.resolve():
-            target.write_bytes(audio_path.read_bytes())
+        last = [0]
+
+        def progress(done, total):
+            percent = 100 * done // total if total else 100
+            if percent > last[0]:
+                last[0] = percent
+                self.report_status(f"Importing {audio_path.name}: {percent}% of {total / 1e6:.0f} MB", job)
+
+        from .importer import import_audio
+
+        target, method = import_audio(
+            audio_path,
+            audio_dir,
+            mode=self.settings.import_mode,
+            progress=progress,
+            cancel=job.cancel_event if job else None,
+        )
+        self.report_status(f"Imported {audio_path.name} ({method}).", job)
         return target
 
-    def queue_transcription(self, source, source_type="file"):
+    def queue_transcription(self, source, source_type="file", priority=PRIORITY_FILE):
         if not self.settings.api_token:
             messagebox.showerror("Missing token", "Set your API token in Settings.")
             self.status_var.set("Missing token.")
-            return
-        self.status_var.set("Sending to API...")
-        thread = threading.Thread(
-            target=self._transcribe_worker,
-            args=(source, source_type),
-            daemon=True,
+            return None
+        if source_type == "live":
+            label = f"{source.recording_path.name} (live)"
+        elif source_type in ("file", "import", "folder"):
+            label = Path(source).name
+        elif source_type == "tracks":
+            label = f"{Path(source[0][1]).name} ({len(source)} tracks)"
+        else:
+            label = source
+        settings = self.settings
+        job = self.scheduler.submit(
+            source, source_type, priority=priority, label=label, force=self.force_var.get(), settings=settings
         )
-        thread.start()
+        if self.journal is not None:
+            self.journal.add(job, settings)
+        self.status_var.set(f"Job {job.id} queued.")
+        return job
+
+    def cancel_selected_job(self):
+        for item in self.jobs_view.selection():
+            self.scheduler.cancel(int(item))
 
-    def _transcribe_worker(self, source, source_type):
+    def _transcribe_worker(self, job):
+        metrics = JobMetrics(job.label, job.source_type)
+        outcome = "failed"
+        # Jobs resumed from the journal keep the settings they were queued with.
+        settings = job.settings or self.settings
+        profile_mode = settings.profile_mode
+        extra = {"job": job.id}
+        try:
+            with profiled(profile_mode, f"job{job.id}") as owner:
+                if profile_mode != "off":
+                    # False when another job held the profiler and this one ran unprofiled.
+                    extra["profiled"] = owner
+                self._run_job(job, metrics)
+            outcome = "waiting" if job.detached else "done"
+        except JobCancelled:
+            outcome = "cancelled"
+            raise
+        finally:
+            # Folder jobs log one record per file from run_batch instead.
+            if job.source_type != "folder":
+                self.task_queue.put(("metrics", job.id, metrics.summary(), None))
+                if settings.metrics_log:
+                    log_metrics(metrics.record(outcome, **extra))
+
+    def _run_job(self, job, metrics):
+        from .batch import collect_files, run_batch
+        from .export import export_transcript, parse_export_formats
+        from .pipeline import callback_eligible, run_transcription
+        from .tracks import transcribe_tracks
+
+        settings = job.settings or self.settings
+        progress = lambda message: self.report_status(message, job)
+        if job.source_type == "live":
+            recording = str(job.source.recording_path)
+        elif job.source_type == "tracks":
+            recording = str(job.source[0][1])
+        else:
+            recording = str(job.source)
+        timing = self.capture_timings.pop(recording, None)
+        if timing is not None:
+            seconds, frames = timing
+            metrics.add("capture_stop", seconds, audio_seconds=frames / parse_int(settings.sample_rate, 16000))
         try:
-            payload, response_text = transcribe_audio(self.settings, source, source_type)
-            display_text = self.extract_display_text(payload, response_text)
-            json_path = self.save_transcript(payload, response_text, display_text)
-            self.task_queue.put(("success", display_text, json_path))
+            if job.source_type == "folder":
+                files = collect_files([job.source])
+                stats = run_batch(
+                    settings,
+                    files,
+                    parse_int(settings.batch_workers, 4),
+                    skip_existing=not job.force,
+                    progress=progress,
+                    cancel=job.cancel_event,
+                )
+                self.report_status(stats.summary(), job)
+                return
+            if job.source_type == "live":
+                session = job.source
+                self.report_status("Waiting for live segments...", job)
+                with metrics.span("live_wait"):
+                    payload, response_text, live_info = session.finish()
+                with metrics.span("display"):
+                    display_text = extract_display_text(settings, payload, response_text)
+                with metrics.span("save"):
+                    json_path = save_transcript(
+                        settings, payload, response_text, display_text, live_info, source=session.recording_path
+                    )
+                exports = parse_export_formats(settings.export_formats)
+                if exports:
+                    with metrics.span("export"):
+                        export_transcript(session.merged, json_path.with_suffix(""), exports)
+                self.task_queue.put(("success", job.id, (payload, response_text, settings), json_path))
+                return
+            if job.source_type == "tracks":
+                result = transcribe_tracks(
+                    settings,
+                    job.source,
+                    progress=progress,
+                    cancel=job.cancel_event,
+                    force=job.force,
+                    metrics=metrics,
+                )
+                self.task_queue.put(
+                    ("success", job.id, (result["payload"], result["response_text"], settings), result["json_path"])
+                )
+                return
+            source, source_type = job.source, job.source_type
+            if source_type == "import":
+                with metrics.span("import") as span:
+                    source = self.import_audio_file(Path(source), job)
+                    span["bytes"] = source.stat().st_size
+                source_type = "file"
+                if self.journal is not None:
+                    self.journal.set_source(job, source, source_type)
+            if callback_eligible(settings, source, source_type):
+                self._submit_with_callback(job, source, source_type, progress)
+                return
+            result = run_transcription(
+                settings,
+                source,
+                source_type,
+                progress=progress,
+                cancel=job.cancel_event,
+                force=job.force,
+                metrics=metrics,
+            )
+            self.task_queue.put(
+                ("success", job.id, (result["payload"], result["response_text"], settings), result["json_path"])
+            )
+        except JobCancelled:
+            self.task_queue.put(("cancelled", job.id, None, None))
+            raise
         except Exception as exc:
-            self.task_queue.put(("error", str(exc), None))
-
-    def extract_display_text(self, payload, response_text):
-        if payload is None:
-            return response_text or ""
-        if self.settings.response_format == "json":
-            return payload.get("text", "")
-        if self.settings.response_format == "verbose_json":
-            segments = payload.get("segments", [])
-            lines = []
-            for seg in segments:
-                start = seg.get("start")
-                end = seg.get("end")
-                speaker = seg.get("speaker")
-                text = seg.get("text", "")
-                ts = ""
-                if start is not None and end is not None:
-                    ts = f"[{start:>6.2f}-{end:>6.2f}]"
-                speaker_part = f"{speaker}: " if speaker else ""
-                line = f"{ts} {speaker_part}{text}".strip()
-                if line:
-                    lines.append(line)
-            if lines:
-                return "\n".join(lines)
-            return payload.get("text", "")
-        return ""
-
-    def save_transcript(self, payload, response_text, display_text):
-        text_dir = self.resolve_dir(self.settings.text_dir, APP_DIR / "text")
-        text_dir.mkdir(parents=True, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        result = {
-            "saved_at": timestamp,
-            "response_format": self.settings.response_format,
-            "data": payload,
-            "text": display_text or response_text,
-        }
-        json_path = text_dir / f"transcript_{timestamp}.json"
-        json_path.write_text(json.dumps(result, ensure_ascii=True, indent=2), encoding="utf-8")
-        return json_path
+            self.task_queue.put(("error", job.id, str(exc), None))
+            raise
+
+    def _webhook_receiver(self):
+        listen = self.settings.callback_listen or "127.0.0.1:0"
+        host, _, port = listen.rpartition(":")
+        if self.webhook is None:
+            from .webhook import WebhookReceiver
+
+            self.webhook = WebhookReceiver(host or "127.0.0.1", parse_int(port, 0))
+        return self.webhook
+
+    def _submit_with_callback(self, job, source, source_type, progress):
+        from .pipeline import finish_callback, submit_callback
+
+        # The worker slot is freed once the API has accepted the job; the webhook
+        # receiver finishes it when the transcript arrives.
+        settings = job.settings or self.settings
+        receiver = self._webhook_receiver()
+        submitted = threading.Event()
+        arrived = threading.Event()
+        upload_info = {}
+
+        def on_result(body, content_type):
+            arrived.set()
+            # Waits for submit_callback so upload_info is complete, but the transcript is
+            # saved even if the submit fails or never returns after the upload.
+            submitted.wait(CALLBACK_SUBMIT_WAIT)
+            if job.cancelled:
+                return
+            try:
+                result = finish_callback(settings, source, source_type, body, content_type, upload_info)
+            except Exception as exc:
+                self.task_queue.put(("error", job.id, str(exc), None))
+                self.scheduler.complete(job.id, "failed", str(exc))
+                return
+            self.task_queue.put(
+                ("success", job.id, (result["payload"], result["response_text"], settings), result["json_path"])
+            )
+            self.scheduler.complete(job.id, "done")
+
+        def on_timeout():
+            if job.cancelled:
+                return
+            self.task_queue.put(("error", job.id, "No callback received from the API.", None))
+            self.scheduler.complete(job.id, "failed", "callback timeout")
+
+        token = receiver.register(on_result, on_timeout)
+        job.detach()
+        try:
+            result, info = submit_callback(
+                settings,
+                source,
+                source_type,
+                receiver.url(token, settings.callback_url),
+                progress=progress,
+                cancel=job.cancel_event,
+                force=job.force,
+            )
+        except BaseException:
+            receiver.unregister(token)
+            submitted.set()
+            if arrived.is_set() and not job.cancelled:
+                # The transcript came back before the submit failed; on_result finishes the job.
+                return
+            job.detached = False
+            raise
+        if result is not None:
+            receiver.unregister(token)
+            job.detached = False
+            self.task_queue.put(
+                ("success", job.id, (result["payload"], result["response_text"], settings), result["json_path"])
+            )
+            return
+        upload_info.update(info)
+        self.report_status("Accepted by the API, waiting for callback...", job)
+        submitted.set()
+
+    def jump_to_timestamp(self):
+        try:
+            seconds = parse_timestamp(self.jump_var.get())
+        except ValueError:
+            self.status_var.set("Enter a time like 1:02:03, 12:30 or 90.")
+            return
+        if not self.output.jump_to(seconds):
+            self.status_var.set("Jumping needs a verbose_json transcript with timestamps.")
+
+    def report_status(self, message, job=None):
+        self.task_queue.put(("status", job.id if job else None, message, None))
 
     def resolve_dir(self, path_value, fallback):
-        if not path_value:
-            return Path(fallback)
-        return Path(path_value)
+        return resolve_dir(path_value, fallback)
 
     def _poll_queue(self):
         try:
             while True:
-                kind, message, path = self.task_queue.get_nowait()
+                kind, job_id, message, path = self.task_queue.get_nowait()
+                prefix = f"Job {job_id}: " if job_id is not None else ""
                 if kind == "success":
-                    self.output.delete(1.0, END)
-                    self.output.insert(END, message)
-                    self.status_var.set(f"Done. Saved to {path}")
-                else:
-                    self.status_var.set(f"Error: {message}")
+                    # Rendered with the settings the job ran with, not the current ones.
+                    payload, response_text, settings = message
+                    # The view formats segments itself, only for the lines it shows.
+                    self.output.show(settings, payload, response_text)
+                    self.shown = (payload, path)
+                    self.status_var.set(f"{prefix}Done. Saved to {path}")
+                elif kind == "status":
+                    self.status_var.set(f"{prefix}{message}")
+                elif kind == "metrics":
+                    self.timing_var.set(f"{prefix}{message}" if message else "")
+                elif kind == "live":
+                    self.output.append_line(message)
+                    session = self.live_session
+                    if session is not None and session.first_text_seconds is not None:
+                        self.status_var.set(f"Recording (live)... first text after {session.first_text_seconds:.1f}s")
+                elif kind == "cancelled":
+                    self.status_var.set(f"{prefix}Cancelled.")
+                elif kind == "error":
+                    self.status_var.set(f"{prefix}Error: {message}")
         except queue.Empty:
             pass
+        self.refresh_jobs()
         self.root.after(200, self._poll_queue)
 
+    def refresh_jobs(self):
+        jobs = self.scheduler.jobs()
+        known = {str(job.id) for job in jobs}
+        for item in self.jobs_view.get_children():
+            if item not in known:
+                self.jobs_view.delete(item)
+        for job in sorted(jobs, key=lambda j: j.id):
+            values = (job.label, job.state, f"{job.elapsed:.1f}s")
+            item = str(job.id)
+            if self.jobs_view.exists(item):
+                self.jobs_view.item(item, values=values)
+            else:
+                self.jobs_view.insert("", 0, iid=item, text=item, values=values)
+
+    def export_shown(self):
+        from .export import EXPORTERS, export_transcript, parse_export_formats
+
+        payload, json_path = self.shown
+        if not isinstance(payload, dict) or "segments" not in payload:
+            messagebox.showinfo("Export", "Exports need a transcript with segments (response format verbose_json).")
+            return
+        formats = parse_export_formats(self.settings.export_formats) or list(EXPORTERS)
+        initial = Path(json_path).stem if json_path else "transcript"
+        target = filedialog.asksaveasfilename(title="Export transcript as", initialfile=initial)
+        if not target:
+            return
+        base = Path(target)
+        if base.suffix in {suffix for suffix, _ in EXPORTERS.values()}:
+            base = base.with_suffix("")
+
+        # Large transcripts take a moment to write; keep the window responsive.
+        def run():
+            started = time.perf_counter()
+            try:
+                paths = export_transcript(payload, base, formats)
+            except (OSError, ValueError) as exc:
+                self.task_queue.put(("error", None, f"Export failed: {exc}", None))
+                return
+            elapsed = time.perf_counter() - started
+            message = f"Exported {', '.join(paths)} to {base.parent} in {elapsed:.2f}s"
+            self.task_queue.put(("status", None, message, None))
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def open_history(self):
+        dialog = Toplevel(self.root)
+        dialog.title("Transcript History")
+        dialog.minsize(760, 420)
+        dialog.columnconfigure(0, weight=1)
+        dialog.rowconfigure(1, weight=1)
+
+        query = StringVar()
+        speaker = StringVar()
+        time_from = StringVar()
+        time_to = StringVar()
+        info = StringVar(value="Indexing transcripts...")
+
+        filters = ttk.Frame(dialog, padding=(10, 10, 10, 0))
+        filters.grid(row=0, column=0, sticky="ew")
+        filters.columnconfigure(1, weight=1)
+        ttk.Label(filters, text="Search").grid(row=0, column=0, padx=(0, 6))
+        search_entry = ttk.Entry(filters, textvariable=query)
+        search_entry.grid(row=0, column=1, sticky="ew")
+        ttk.Label(filters, text="Speaker").grid(row=0, column=2, padx=(10, 6))
+        ttk.Entry(filters, textvariable=speaker, width=14).grid(row=0, column=3)
+        ttk.Label(filters, text="From").grid(row=0, column=4, padx=(10, 6))
+        ttk.Entry(filters, textvariable=time_from, width=9).grid(row=0, column=5)
+        ttk.Label(filters, text="To").grid(row=0, column=6, padx=(10, 6))
+        ttk.Entry(filters, textvariable=time_to, width=9).grid(row=0, column=7)
+
+        results = ttk.Treeview(
+            dialog, columns=("saved", "source", "time", "speaker", "text"), show="headings", selectmode="browse"
+        )
+        for column, title, width in (
+            ("saved", "Saved", 130),
+            ("source", "Audio", 160),
+            ("time", "Time", 70),
+            ("speaker", "Speaker", 90),
+            ("text", "Text", 320),
+        ):
+            results.heading(column, text=title)
+            results.column(column, width=width, stretch=column == "text")
+        results.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
+        ttk.Label(dialog, textvariable=info, style="Subtle.TLabel").grid(
+            row=2, column=0, sticky="w", padx=10, pady=(0, 10)
+        )
+
+        store = open_store()
+        hits = {}
+
+        def run_search(event=None):
+            try:
+                start = parse_timestamp(time_from.get()) if time_from.get().strip() else None
+                end = parse_timestamp(time_to.get()) if time_to.get().strip() else None
+            except ValueError:
+                info.set("Enter times like 1:02:03, 12:30 or 90.")
+                return
+            started = time.perf_counter()
+            rows = store.search(query.get(), speaker.get().strip(), start, end)
+            elapsed = (time.perf_counter() - started) * 1000
+            results.delete(*results.get_children())
+            hits.clear()
+            for index, hit in enumerate(rows):
+                when = "" if hit["start"] is None else f"{hit['start']:.1f}s"
+                source = Path(hit["source"]).name if hit["source"] else ""
+                values = (hit["saved_at"] or "", source, when, hit["speaker"] or "", hit["snippet"])
+                hits[str(index)] = hit
+                results.insert("", "end", iid=str(index), values=values)
+            info.set(f"{len(rows)} results in {elapsed:.1f} ms")
+
+        def open_hit(event=None):
+            selected = results.selection()
+            if not selected:
+                return
+            hit = hits[selected[0]]
+            try:
+                record = json.loads(Path(hit["json_path"]).read_text(encoding="utf-8"))
+            except (OSError, ValueError) as exc:
+                info.set(f"Could not open transcript: {exc}")
+                return
+            settings = replace(self.settings, response_format=record.get("response_format") or "json")
+            self.output.show(settings, record.get("data"), record.get("text"))
+            self.shown = (record.get("data"), hit["json_path"])
+            if hit["start"] is not None:
+                self.output.jump_to(hit["start"])
+            self.status_var.set(f"Opened {hit['json_path']}")
+
+        # Importing new JSON files can take a while on first use; keep the dialog live.
+        synced = threading.Event()
+        text_dir = resolve_dir(self.settings.text_dir, APP_DIR / "text")
+
+        def sync():
+            try:
+                store.sync(text_dir)
+            finally:
+                synced.set()
+
+        threading.Thread(target=sync, daemon=True).start()
+
+        def wait_for_sync():
+            if not dialog.winfo_exists():
+                return
+            if synced.is_set():
+                run_search()
+            else:
+                dialog.after(100, wait_for_sync)
+
+        search_entry.bind("<Return>", run_search)
+        results.bind("<Double-1>", open_hit)
+        results.bind("<Return>", open_hit)
+        ttk.Button(filters, text="Search", command=run_search).grid(row=0, column=8, padx=(10, 0))
+        search_entry.focus_set()
+        wait_for_sync()
+
     def open_settings(self):
         dialog = Toplevel(self.root)
         dialog.title("Settings")
         dialog.resizable(False, False)
-        dialog.columnconfigure(1, weight=1)
+        dialog.columnconfigure(0, weight=1)
+        # One tab per group keeps the dialog short enough that Save stays on screen.
+        notebook = ttk.Notebook(dialog)
+        notebook.grid(row=0, column=0, padx=10, pady=(10, 0), sticky="nsew")
 
+        page = None
         row = 0
 
+        def add_page(title):
+            nonlocal page, row
+            page = ttk.Frame(notebook, padding=6)
+            page.columnconfigure(1, weight=1)
+            notebook.add(page, text=title)
+            row = 0
+
         def add_entry_row(label_text, var, show=None):
             nonlocal row
-            ttk.Label(dialog, text=label_text).grid(row=row, column=0, padx=10, pady=4, sticky="w")
+            ttk.Label(page, text=label_text).grid(row=row, column=0, padx=10, pady=4, sticky="w")
             entry_kwargs = {"textvariable": var, "width": 50}
             if show is not None:
                 entry_kwargs["show"] = show
-            entry = ttk.Entry(dialog, **entry_kwargs)
+            entry = ttk.Entry(page, **entry_kwargs)
             entry.grid(row=row, column=1, padx=10, pady=4, sticky="ew")
             row += 1
             return entry
 
         def add_combo_row(label_text, var, values, state="readonly", width=47):
             nonlocal row
-            ttk.Label(dialog, text=label_text).grid(row=row, column=0, padx=10, pady=4, sticky="w")
-            combo = ttk.Combobox(dialog, textvariable=var, values=values, width=width, state=state)
+            ttk.Label(page, text=label_text).grid(row=row, column=0, padx=10, pady=4, sticky="w")
+            combo = ttk.Combobox(page, textvariable=var, values=values, width=width, state=state)
             combo.grid(row=row, column=1, padx=10, pady=4, sticky="ew")
             row += 1
             return combo
 
         def add_check_row(label_text, var, command=None):
             nonlocal row
-            ttk.Label(dialog, text=label_text).grid(row=row, column=0, padx=10, pady=4, sticky="w")
-            check = ttk.Checkbutton(dialog, variable=var, command=command)
+            ttk.Label(page, text=label_text).grid(row=row, column=0, padx=10, pady=4, sticky="w")
+            check = ttk.Checkbutton(page, variable=var, command=command)
             check.grid(row=row, column=1, padx=10, pady=4, sticky="w")
             row += 1
             return check
 
         def add_dir_row(label_text, var):
             nonlocal row
-            ttk.Label(dialog, text=label_text).grid(row=row, column=0, padx=10, pady=4, sticky="w")
-            entry = ttk.Entry(dialog, textvariable=var, width=50)
+            ttk.Label(page, text=label_text).grid(row=row, column=0, padx=10, pady=4, sticky="w")
+            entry = ttk.Entry(page, textvariable=var, width=50)
             entry.grid(row=row, column=1, padx=(10, 0), pady=4, sticky="ew")
-            ttk.Button(dialog, text="Browse", command=lambda: self.browse_dir(var)).grid(
+            ttk.Button(page, text="Browse", command=lambda: self.browse_dir(var)).grid(
                 row=row, column=2, padx=6, pady=4
             )
             row += 1
@@ -312,6 +961,11 @@ class App:
 
         api_token = StringVar(value=self.settings.api_token)
         api_base = StringVar(value=self.settings.api_base)
+        endpoint_mode = StringVar(value=self.settings.endpoint_mode)
+        api_endpoints = StringVar(value=self.settings.api_endpoints)
+        eu_only = BooleanVar(value=self.settings.eu_only)
+        hedge_requests = BooleanVar(value=self.settings.hedge_requests)
+        hedge_max_mb = StringVar(value=self.settings.hedge_max_mb)
         language = StringVar(value=self.settings.language)
         response_format = StringVar(value=self.settings.response_format)
         prompt = StringVar(value=self.settings.prompt)
@@ -321,20 +975,45 @@ class App:
         max_speakers = StringVar(value=self.settings.max_speakers)
         word_timestamps = BooleanVar(value=self.settings.word_timestamps)
         callback_url = StringVar(value=self.settings.callback_url)
+        callback_listen = StringVar(value=self.settings.callback_listen)
         audio_dir = StringVar(value=self.settings.audio_dir)
         text_dir = StringVar(value=self.settings.text_dir)
+        input_device = StringVar(value=self.settings.input_device)
         sample_rate = StringVar(value=self.settings.sample_rate)
         channels = StringVar(value=self.settings.channels)
+        capture_format = StringVar(value=self.settings.capture_format)
+        multitrack = BooleanVar(value=self.settings.multitrack)
+        tracks = StringVar(value=self.settings.tracks)
+        track_names = StringVar(value=self.settings.track_names)
+        spill_to_disk = BooleanVar(value=self.settings.spill_to_disk)
+        recording_format = StringVar(value=self.settings.recording_format)
+        upload_codec = StringVar(value=self.settings.upload_codec)
+        upload_mono = BooleanVar(value=self.settings.upload_mono)
+        upload_resample = BooleanVar(value=self.settings.upload_resample)
+        chunk_minutes = StringVar(value=self.settings.chunk_minutes)
+        chunk_overlap = StringVar(value=self.settings.chunk_overlap)
+        chunk_workers = StringVar(value=self.settings.chunk_workers)
+        connect_timeout = StringVar(value=self.settings.connect_timeout)
+        read_timeout = StringVar(value=self.settings.read_timeout)
+        max_retries = StringVar(value=self.settings.max_retries)
+        max_jobs = StringVar(value=self.settings.max_jobs)
+        batch_workers = StringVar(value=self.settings.batch_workers)
+        cache_enabled = BooleanVar(value=self.settings.cache_enabled)
+        cache_max_mb = StringVar(value=self.settings.cache_max_mb)
+        cache_max_days = StringVar(value=self.settings.cache_max_days)
+        import_mode = StringVar(value=self.settings.import_mode)
+        live_mode = BooleanVar(value=self.settings.live_mode)
+        live_pause_ms = StringVar(value=self.settings.live_pause_ms)
+        trim_silence = BooleanVar(value=self.settings.trim_silence)
+        trim_min_gap_ms = StringVar(value=self.settings.trim_min_gap_ms)
+        trim_keep_ms = StringVar(value=self.settings.trim_keep_ms)
+        export_formats = StringVar(value=self.settings.export_formats)
+        metrics_log = BooleanVar(value=self.settings.metrics_log)
+        profile_mode = StringVar(value=self.settings.profile_mode)
 
+        add_page("General")
         add_entry_row("API token", api_token, show="*")
 
-        add_combo_row(
-            "API base",
-            api_base,
-            ["https://api.lemonfox.ai", "https://eu-api.lemonfox.ai"],
-            state="readonly",
-        )
-
         language_values = [
             "english",
             "german",
@@ -362,7 +1041,7 @@ class App:
         )
 
         ttk.Label(
-            dialog,
+            page,
             text="Speaker labels and word timestamps require verbose_json.",
             foreground="#666666",
         ).grid(row=row, column=0, columnspan=2, padx=10, pady=(0, 6), sticky="w")
@@ -375,13 +1054,65 @@ class App:
         min_entry = add_entry_row("Min speakers", min_speakers)
         max_entry = add_entry_row("Max speakers", max_speakers)
         word_check = add_check_row("Word timestamps", word_timestamps)
-        add_entry_row("Callback URL", callback_url)
 
         add_dir_row("Audio folder", audio_dir)
         add_dir_row("Text folder", text_dir)
+        add_combo_row("Import picked files", import_mode, ["link", "copy", "reference"], state="readonly")
+        add_entry_row("Also export (srt, vtt, txt, md, words)", export_formats)
+
+        add_page("Audio")
+        try:
+            from .audio import input_devices
 
+            devices = input_devices()
+        except Exception:
+            # No PortAudio or no devices: the name can still be typed in.
+            devices = []
+        add_combo_row("Input device", input_device, ["", *devices], state="normal")
         add_combo_row("Sample rate", sample_rate, ["8000", "16000", "22050", "44100", "48000"], state="normal")
         add_combo_row("Channels", channels, ["1", "2"], state="normal")
+        add_combo_row("Capture format", capture_format, ["int16", "float32"], state="readonly")
+        add_check_row("Multi-track recording", multitrack)
+        add_entry_row("Tracks (device or device#channel; ...)", tracks)
+        add_entry_row("Track speakers (name; ...)", track_names)
+        add_check_row("Buffer recordings on disk", spill_to_disk)
+        add_combo_row("Recording format", recording_format, ["wav", "flac"], state="readonly")
+        add_check_row("Live transcription while recording", live_mode)
+        add_entry_row("Live pause to cut (ms)", live_pause_ms)
+
+        add_page("Upload")
+        add_combo_row("Upload codec", upload_codec, ["original", "wav", "flac", "opus"], state="readonly")
+        add_check_row("Downmix upload to mono", upload_mono)
+        add_check_row("Resample upload to 16 kHz", upload_resample)
+        add_check_row("Trim long silences before upload", trim_silence)
+        add_entry_row("Trim pauses longer than (ms)", trim_min_gap_ms)
+        add_entry_row("Silence kept per pause (ms)", trim_keep_ms)
+        add_entry_row("Chunk long audio (minutes)", chunk_minutes)
+        add_entry_row("Chunk overlap (seconds)", chunk_overlap)
+        add_entry_row("Parallel chunk uploads", chunk_workers)
+        add_check_row("Cache transcripts", cache_enabled)
+        add_entry_row("Cache size (MB)", cache_max_mb)
+        add_entry_row("Cache max age (days)", cache_max_days)
+
+        add_page("Network")
+        # Editable so a proxy or the local mock server can be entered as the base.
+        add_combo_row("API base", api_base, ["https://api.lemonfox.ai", "https://eu-api.lemonfox.ai"], state="normal")
+        add_combo_row("Endpoint selection", endpoint_mode, ["fixed", "auto"], state="readonly")
+        add_entry_row("Other endpoints (url; eu=url; ...)", api_endpoints)
+        add_check_row("EU endpoints only", eu_only)
+        add_check_row("Hedge short uploads", hedge_requests)
+        add_entry_row("Hedge uploads up to (MB)", hedge_max_mb)
+        add_entry_row("Connect timeout (s)", connect_timeout)
+        add_entry_row("Read timeout (s)", read_timeout)
+        add_entry_row("Max retries", max_retries)
+        add_entry_row("Callback URL", callback_url)
+        add_entry_row("Callback receiver (host:port)", callback_listen)
+        add_entry_row("Parallel jobs", max_jobs)
+        add_entry_row("Parallel folder uploads", batch_workers)
+
+        add_page("Diagnostics")
+        add_check_row("Log per-stage timings (metrics.jsonl)", metrics_log)
+        add_combo_row("Profile jobs", profile_mode, list(PROFILE_MODES), state="readonly")
 
         def update_speaker_fields():
             enabled = speaker_labels.get() and response_format.get().strip() == "verbose_json"
@@ -406,6 +1137,11 @@ class App:
             self.settings = AppSettings(
                 api_token=api_token.get().strip(),
                 api_base=api_base.get().strip(),
+                endpoint_mode=endpoint_mode.get().strip(),
+                api_endpoints=api_endpoints.get().strip(),
+                eu_only=eu_only.get(),
+                hedge_requests=hedge_requests.get(),
+                hedge_max_mb=hedge_max_mb.get().strip(),
                 language=language.get().strip(),
                 response_format=response_format.get().strip(),
                 prompt=prompt.get().strip(),
@@ -415,17 +1151,50 @@ class App:
                 max_speakers=max_speakers.get().strip(),
                 word_timestamps=word_timestamps.get(),
                 callback_url=callback_url.get().strip(),
+                callback_listen=callback_listen.get().strip(),
                 audio_dir=audio_dir.get().strip(),
                 text_dir=text_dir.get().strip(),
+                input_device=input_device.get().strip(),
                 sample_rate=sample_rate.get().strip(),
                 channels=channels.get().strip(),
+                capture_format=capture_format.get().strip(),
+                multitrack=multitrack.get(),
+                tracks=tracks.get().strip(),
+                track_names=track_names.get().strip(),
+                spill_to_disk=spill_to_disk.get(),
+                recording_format=recording_format.get().strip(),
+                upload_codec=upload_codec.get().strip(),
+                upload_mono=upload_mono.get(),
+                upload_resample=upload_resample.get(),
+                chunk_minutes=chunk_minutes.get().strip(),
+                chunk_overlap=chunk_overlap.get().strip(),
+                chunk_workers=chunk_workers.get().strip(),
+                connect_timeout=connect_timeout.get().strip(),
+                read_timeout=read_timeout.get().strip(),
+                max_retries=max_retries.get().strip(),
+                max_jobs=max_jobs.get().strip(),
+                batch_workers=batch_workers.get().strip(),
+                cache_enabled=cache_enabled.get(),
+                cache_max_mb=cache_max_mb.get().strip(),
+                cache_max_days=cache_max_days.get().strip(),
+                import_mode=import_mode.get().strip(),
+                live_mode=live_mode.get(),
+                live_pause_ms=live_pause_ms.get().strip(),
+                trim_silence=trim_silence.get(),
+                trim_min_gap_ms=trim_min_gap_ms.get().strip(),
+                trim_keep_ms=trim_keep_ms.get().strip(),
+                export_formats=export_formats.get().strip(),
+                metrics_log=metrics_log.get(),
+                profile_mode=profile_mode.get().strip(),
             )
             save_settings(self.settings)
+            self.scheduler.set_max_workers(parse_int(self.settings.max_jobs, 2))
             dialog.destroy()
 
-        ttk.Button(dialog, text="Save", command=save).grid(
-            row=row, column=2, padx=10, pady=10, sticky="e"
-        )
+        buttons = ttk.Frame(dialog)
+        buttons.grid(row=1, column=0, padx=10, pady=10, sticky="e")
+        ttk.Button(buttons, text="Cancel", command=dialog.destroy).pack(side="right")
+        ttk.Button(buttons, text="Save", command=save).pack(side="right", padx=(0, 6))
 
     def browse_dir(self, var):
         path = filedialog.askdirectory()
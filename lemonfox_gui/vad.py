@@ -0,0 +1,83 @@
+import numpy as np
+
+from .dsp import frame_rms
+
+FRAME_SECONDS = 0.03
+FLOOR_DB = -60.0
+SPEECH_MARGIN_DB = 12.0
+MIN_SPEECH_DB = -50.0
+FLOOR_RISE = 0.01
+
+
+class UtteranceDetector:
+    # Energy-based voice activity detector: a frame is speech when it is well above an
+    # adaptive noise floor. Utterances close after a pause or when they hit max length.
+    def __init__(
+        self,
+        sample_rate: int,
+        pause_seconds: float = 0.6,
+        min_speech_seconds: float = 0.3,
+        max_seconds: float = 30.0,
+        padding_seconds: float = 0.2,
+    ):
+        self.frame_len = max(1, int(FRAME_SECONDS * sample_rate))
+        self.pause_frames = max(1, int(pause_seconds / FRAME_SECONDS))
+        self.min_speech_frames = max(1, int(min_speech_seconds / FRAME_SECONDS))
+        self.max_frames = max(1, int(max_seconds / FRAME_SECONDS))
+        self.padding = int(padding_seconds * sample_rate)
+        self._pending = None
+        self._frame = 0
+        self._floor = FLOOR_DB
+        self._start = None
+        self._last_speech = None
+        self._speech_frames = 0
+
+    def feed(self, block):
+        if self._pending is not None:
+            block = np.concatenate([self._pending, block], axis=0)
+        usable = len(block) - len(block) % self.frame_len
+        self._pending = block[usable:].copy() if usable < len(block) else None
+        levels = 20 * np.log10(np.maximum(frame_rms(block[:usable], self.frame_len), 1e-6))
+        cuts = []
+        for level in levels:
+            speech = level > max(self._floor + SPEECH_MARGIN_DB, MIN_SPEECH_DB)
+            if level < self._floor:
+                self._floor = level
+            else:
+                # The floor follows background noise; during speech it only creeps up
+                # so a permanent rise in noise is still learned eventually.
+                rise = FLOOR_RISE / 10 if speech else FLOOR_RISE
+                self._floor += rise * (level - self._floor)
+            if speech:
+                if self._start is None:
+                    self._start = self._frame
+                    self._speech_frames = 0
+                self._last_speech = self._frame
+                self._speech_frames += 1
+            if self._start is not None:
+                paused = self._frame - self._last_speech >= self.pause_frames
+                too_long = self._frame - self._start + 1 >= self.max_frames
+                if paused or too_long:
+                    cut = self._close(self._last_speech + 1 if paused else self._frame + 1)
+                    if cut:
+                        cuts.append(cut)
+            self._frame += 1
+        return cuts
+
+    def _close(self, end_frame):
+        start, speech = self._start, self._speech_frames
+        self._start = None
+        if speech < self.min_speech_frames:
+            return None
+        return (
+            max(0, start * self.frame_len - self.padding),
+            end_frame * self.frame_len + self.padding,
+        )
+
+    def finish(self, total_frames: int):
+        if self._start is None:
+            return []
+        cut = self._close(self._last_speech + 1)
+        if cut is None:
+            return []
+        return [(cut[0], min(cut[1], total_frames))]
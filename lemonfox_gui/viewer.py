@@ -0,0 +1,198 @@
+from bisect import bisect_right
+from tkinter import Text, END, ttk
+
+from .settings import AppSettings
+from .transcripts import extract_display_text, segment_line
+
+# The Text widget only ever holds a window of lines around the view; the scrollbar
+# is driven by the line position in the whole transcript instead of the widget.
+WINDOW_LINES = 400
+EDGE_LINES = 100
+FIRST_PAINT_LINES = 80
+BATCH_LINES = 100
+BATCH_DELAY_MS = 1
+
+
+def parse_timestamp(value: str):
+    # Accepts "90", "1:30", "1:02:03" and fractional seconds like "1:30.5".
+    parts = value.strip().split(":")
+    if len(parts) > 3:
+        raise ValueError(f"Invalid timestamp: {value}")
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    return max(0.0, seconds)
+
+
+class TranscriptView:
+    def __init__(self, parent, **text_options):
+        self.frame = ttk.Frame(parent)
+        self.frame.rowconfigure(0, weight=1)
+        self.frame.columnconfigure(0, weight=1)
+        self.text = Text(self.frame, **text_options)
+        self.text.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.text.configure(yscrollcommand=self._on_text_scroll)
+        self.text.tag_configure("current", background="#fff3b0")
+
+        self._segments = None
+        self._lines = []
+        self._starts = None
+        self._total = 0
+        self._start = 0
+        self._end = 0
+        self._target_end = 0
+        self._pending = None
+        self._rewindow = None
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    @property
+    def total_lines(self):
+        return self._total
+
+    def show(self, settings: AppSettings, payload, response_text):
+        segments = payload.get("segments") if payload and settings.response_format == "verbose_json" else None
+        if segments:
+            self._segments = segments
+            self._lines = []
+            self._total = len(segments)
+        else:
+            self._segments = None
+            text = extract_display_text(settings, payload, response_text)
+            self._lines = text.split("\n") if text else []
+            self._total = len(self._lines)
+        self._starts = None
+        self._render(0)
+
+    def clear(self):
+        self._segments = None
+        self._lines = []
+        self._starts = None
+        self._total = 0
+        self._render(0)
+
+    def append_line(self, line: str):
+        # Used by live transcription: plain lines that arrive one at a time.
+        if self._segments is not None:
+            self.clear()
+        following = self._target_end == self._total
+        self._lines.append(line)
+        self._total += 1
+        if not following:
+            return
+        self._target_end = self._total
+        if self._end == self._total - 1:
+            self._insert_until(self._total)
+        if self._end - self._start > WINDOW_LINES:
+            drop = self._end - self._start - WINDOW_LINES
+            self.text.delete("1.0", f"{drop + 1}.0")
+            self._start += drop
+        self.text.see(END)
+
+    def jump_to(self, seconds: float):
+        # Only verbose_json transcripts carry segment times.
+        if self._segments is None:
+            return False
+        if self._starts is None:
+            self._starts = [seg.get("start") or 0.0 for seg in self._segments]
+        index = max(0, bisect_right(self._starts, seconds) - 1)
+        self.scroll_to_line(index)
+        row = index - self._start + 1
+        self.text.tag_remove("current", "1.0", END)
+        self.text.tag_add("current", f"{row}.0", f"{row}.end")
+        return True
+
+    def scroll_to_line(self, line: int):
+        line = max(0, min(line, self._total - 1))
+        if self._inside(line):
+            self._insert_until(min(self._target_end, line + FIRST_PAINT_LINES))
+            self.text.yview(f"{line - self._start + 1}.0")
+        else:
+            self._render(line)
+
+    def _line(self, index):
+        if self._segments is not None:
+            return segment_line(self._segments[index])
+        return self._lines[index]
+
+    def _inside(self, line):
+        low = self._start + (EDGE_LINES // 2 if self._start > 0 else 0)
+        high = self._target_end - (EDGE_LINES // 2 if self._target_end < self._total else 0)
+        return low <= line < high
+
+    def _render(self, top):
+        # Replace the window so it starts a margin above `top`. The first screenful is
+        # inserted right away; the rest of the window follows in batches.
+        if self._pending is not None:
+            self.text.after_cancel(self._pending)
+            self._pending = None
+        top = max(0, min(top, self._total - 1))
+        self._start = self._end = self._window_start(top)
+        self._target_end = min(self._total, self._start + WINDOW_LINES)
+        self.text.delete("1.0", END)
+        self._insert_until(min(self._target_end, top + FIRST_PAINT_LINES))
+        self.text.yview(f"{top - self._start + 1}.0")
+        self._schedule()
+
+    def _window_start(self, top):
+        return max(0, min(top - EDGE_LINES, self._total - WINDOW_LINES))
+
+    def _insert_until(self, stop):
+        if stop <= self._end:
+            return
+        chunk = "\n".join(self._line(index) for index in range(self._end, stop))
+        if self._end > self._start:
+            chunk = "\n" + chunk
+        self.text.insert("end-1c", chunk)
+        self._end = stop
+
+    def _schedule(self):
+        if self._end < self._target_end and self._pending is None:
+            self._pending = self.text.after(BATCH_DELAY_MS, self._fill)
+
+    def _fill(self):
+        self._pending = None
+        self._insert_until(min(self._target_end, self._end + BATCH_LINES))
+        self._schedule()
+
+    def _top_line(self):
+        return self._start + int(self.text.index("@0,0").split(".")[0]) - 1
+
+    def _visible_lines(self):
+        top = int(self.text.index("@0,0").split(".")[0])
+        bottom = int(self.text.index(f"@0,{self.text.winfo_height()}").split(".")[0])
+        return max(1, bottom - top + 1)
+
+    def _on_text_scroll(self, first, last):
+        if self._total == 0:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        top = self._top_line()
+        bottom = min(self._total - 1, top + self._visible_lines())
+        self.scrollbar.set(top / self._total, (bottom + 1) / self._total)
+        # Native scrolling (wheel, keys, selection drag) moves within the window;
+        # slide the window once the view gets close to either of its edges.
+        if (not self._inside(top) or not self._inside(bottom)) and self._rewindow is None:
+            self._rewindow = self.text.after_idle(self._slide)
+
+    def _slide(self):
+        self._rewindow = None
+        if not self._total:
+            return
+        top = self._top_line()
+        bottom = min(self._total - 1, top + self._visible_lines())
+        if not (self._inside(top) and self._inside(bottom)) and self._window_start(top) != self._start:
+            self._render(top)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if self._total == 0:
+            return
+        if action == "moveto":
+            self.scroll_to_line(int(float(amount) * self._total))
+        elif unit == "pages":
+            self.scroll_to_line(self._top_line() + int(amount) * self._visible_lines())
+        else:
+            self.scroll_to_line(self._top_line() + int(amount))
@@ -0,0 +1,114 @@
+import json
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CALLBACK_PATH = "/lemonfox"
+CALLBACK_TIMEOUT = 4 * 3600
+MAX_BODY_BYTES = 256 * 1024 * 1024
+
+
+def parse_callback(body: bytes, content_type: str, response_format: str):
+    # The callback carries the same body the blocking request would have returned.
+    text = body.decode("utf-8", errors="replace")
+    data = None
+    if "json" in (content_type or "") or text.lstrip().startswith("{"):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None
+    if isinstance(data, dict) and data.get("error"):
+        error = data["error"]
+        raise RuntimeError(f"API error: {error.get('message', error) if isinstance(error, dict) else error}")
+    if response_format in ("json", "verbose_json"):
+        if not isinstance(data, dict):
+            raise RuntimeError("Callback did not contain a JSON transcript")
+        return data, None
+    if isinstance(data, dict) and isinstance(data.get("text"), str) and response_format == "text":
+        return None, data["text"]
+    return None, text
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        receiver = self.server.receiver
+        token = self.path.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1]
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.send_error(413)
+            return
+        body = self.rfile.read(length)
+        entry = receiver._pop(token)
+        if entry is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        entry[0](body, self.headers.get("Content-Type", ""))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class WebhookReceiver:
+    # Small embedded HTTP server that matches callback POSTs to pending jobs by the
+    # random token in the callback path.
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.receiver = self
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    @property
+    def local_url(self):
+        host = self._server.server_address[0]
+        return f"http://{host}:{self.port}"
+
+    def url(self, token: str, base: str = ""):
+        # base is the address the API can reach (e.g. a tunnel to this port).
+        return f"{(base or self.local_url).rstrip('/')}{CALLBACK_PATH}/{token}"
+
+    def register(self, on_result, on_timeout=None, timeout: float = CALLBACK_TIMEOUT):
+        token = secrets.token_urlsafe(16)
+        timer = threading.Timer(timeout, self._expire, args=(token,))
+        timer.daemon = True
+        with self._lock:
+            self._pending[token] = (on_result, on_timeout, timer)
+        timer.start()
+        return token
+
+    def unregister(self, token: str):
+        self._pop(token)
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _pop(self, token):
+        with self._lock:
+            entry = self._pending.pop(token, None)
+        if entry is not None:
+            entry[2].cancel()
+        return entry
+
+    def _expire(self, token):
+        entry = self._pop(token)
+        if entry is not None and entry[1] is not None:
+            entry[1]()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+        with self._lock:
+            entries = list(self._pending.values())
+            self._pending.clear()
+        for entry in entries:
+            entry[2].cancel()
@@ -0,0 +1,65 @@
+import threading
+import time
+from pathlib import Path
+
+import soundfile as sf
+
+DRAIN_INTERVAL = 0.1
+SYNC_INTERVAL = 1.0
+# libsndfile command; soundfile has no public wrapper for it.
+SFC_UPDATE_HEADER_NOW = 0x1060
+
+
+def update_header(sound_file):
+    # Rewrites the RIFF/data chunk sizes of a WAV being written, so the file on disk
+    # reads as every frame written so far. flush() alone leaves the data size at 0.
+    sf._snd.sf_command(sound_file._file, SFC_UPDATE_HEADER_NOW, sf._ffi.NULL, 0)
+
+
+class StreamWriter:
+    def __init__(self, buffer, path, sample_rate: int, file_format: str = "WAV"):
+        self.path = Path(path)
+        self.error = None
+        self._buffer = buffer
+        self._file = sf.SoundFile(
+            path, "w", samplerate=sample_rate, channels=buffer.channels, format=file_format
+        )
+        self._written = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def frames(self):
+        return self._written
+
+    def _drain(self):
+        frames = self._buffer.frames
+        for block in self._buffer.read(self._written, frames):
+            self._file.write(block)
+        self._written = frames
+
+    def _run(self):
+        last_sync = time.monotonic()
+        try:
+            while not self._stop.wait(DRAIN_INTERVAL):
+                self._drain()
+                # Syncing regularly keeps a playable partial file on disk if the app dies.
+                if time.monotonic() - last_sync >= SYNC_INTERVAL:
+                    update_header(self._file)
+                    self._file.flush()
+                    last_sync = time.monotonic()
+        except Exception as exc:
+            self.error = exc
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        try:
+            if self.error is None:
+                self._drain()
+        finally:
+            self._file.close()
+        if self.error is not None:
+            raise RuntimeError(f"Writing {self.path} failed: {self.error}")
+        return self._written